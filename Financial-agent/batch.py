@@ -0,0 +1,117 @@
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+from financial_agent import build_report_agent, build_report_prompt
+from common.rate_limit import BATCH, request_priority
+from common.response_cache import cached_run
+from market_data import MAX_WORKERS, fetch_snapshots
+from market_store import get_market_store
+
+logger = logging.getLogger(__name__)
+
+# Reports are written by Groq, which rate limits far earlier than Yahoo Finance
+MAX_REPORT_WORKERS = 4
+
+
+def read_tickers(tickers, ticker_file=None):
+    symbols = list(tickers or [])
+    if ticker_file:
+        for line in Path(ticker_file).read_text().splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                symbols.extend(line.replace(",", " ").split())
+    return list(dict.fromkeys(symbol.upper() for symbol in symbols))
+
+
+def write_report(out_dir, output_format, entry):
+    if output_format == "jsonl":
+        with open(out_dir / "reports.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+        return
+
+    path = out_dir / f"{entry['symbol']}.md"
+    if entry.get("report"):
+        body = entry["report"]
+    else:
+        body = f"Report not available: {entry.get('error', 'no report generated')}"
+    path.write_text(f"# {entry['symbol']}\n\n_Generated {entry['generated_at']}_\n\n{body}\n", encoding="utf-8")
+
+
+def generate_report(snapshot):
+    # Interactive requests sharing the Groq quota in this process go first
+    with request_priority(BATCH):
+        return cached_run(build_report_agent(), build_report_prompt(snapshot)).content
+
+
+def run_batch(tickers, out_dir, output_format="markdown", max_workers=MAX_WORKERS,
+              max_report_workers=MAX_REPORT_WORKERS, data_only=False):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.monotonic()
+    snapshots = fetch_snapshots(tickers, max_workers)
+    logger.info("Fetched market data for %d tickers in %.1fs", len(tickers), time.monotonic() - started)
+
+    def entry_for(symbol, report=None, error=None):
+        entry = {
+            "symbol": symbol,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "report": report,
+            "data": snapshots[symbol],
+        }
+        if error:
+            entry["error"] = error
+        return entry
+
+    if data_only:
+        for symbol in tickers:
+            write_report(out_dir, output_format, entry_for(symbol))
+        return
+
+    with ThreadPoolExecutor(max_workers=max_report_workers, thread_name_prefix="report") as pool:
+        futures = {pool.submit(generate_report, snapshots[symbol]): symbol for symbol in tickers}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                entry = entry_for(symbol, report=future.result())
+            except Exception as e:
+                logger.warning("Report for %s failed: %s", symbol, e)
+                entry = entry_for(symbol, error=str(e))
+            write_report(out_dir, output_format, entry)
+
+    logger.info("Wrote %d reports to %s in %.1fs", len(tickers), out_dir, time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate stock reports for a watchlist of tickers.")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols, e.g. NVDA AAPL MSFT")
+    parser.add_argument("-f", "--file", help="File with tickers, one or more per line ('#' starts a comment)")
+    parser.add_argument("-o", "--out", default="reports", help="Output directory (default: reports)")
+    parser.add_argument("--format", choices=["markdown", "jsonl"], default="markdown",
+                        help="One Markdown file per ticker or a single reports.jsonl")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS,
+                        help="Concurrent Yahoo Finance lookups")
+    parser.add_argument("--max-report-workers", type=int, default=MAX_REPORT_WORKERS,
+                        help="Concurrent report generations")
+    parser.add_argument("--data-only", action="store_true", help="Only fetch market data, skip the LLM reports")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use only the local market data store, never call Yahoo Finance")
+    args = parser.parse_args()
+
+    tickers = read_tickers(args.tickers, args.file)
+    if not tickers:
+        parser.error("no tickers given")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.offline:
+        get_market_store().offline = True
+    run_batch(tickers, args.out, args.format, args.max_workers, args.max_report_workers, args.data_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,79 +1,266 @@
-from phi.agent import Agent
-from phi.model.groq import Groq
-from phi.tools.yfinance import YFinanceTools
-from phi.tools.duckduckgo import DuckDuckGo
-import groq
-
-import os
-from dotenv import load_dotenv
-load_dotenv()
-groq.api_key = os.getenv("GROQ_API_KEY")
-
-# Web Search Agent
-web_search_agent = Agent(
-    name="Web Search Agent",
-    role="Search the web for information",
-    model=Groq(id="llama3-groq-70B-8192-tool-use-preview"),
-    description=(
-        "A dedicated agent designed to search and retrieve the latest information "
-        "from the web. Specializes in finding up-to-date news and online data "
-        "using various web-based tools. The agent leverages the DuckDuckGo search engine "
-        "to gather web information efficiently and is focused on returning relevant, "
-        "credible sources, ensuring that results are trustworthy. Ideal for retrieving "
-        "news articles, blogs, and real-time updates on a broad range of topics."
-    ),
-    tools=[DuckDuckGo()],
-    instructions=[
-        "Always include sources to ensure reliability.",
-        "Provide concise summaries of the information found, including essential details."
-    ],
-    show_tools_calls=True,
-    markdown=True,
-)
-
-# Financial Agent
-financial_agent = Agent(
-    name="Financial Agent",
-    model=Groq(id="llama3-groq-70B-8192-tool-use-preview"),
-    description=(
-        "An expert financial analysis agent focused on retrieving and presenting key "
-        "financial data. This agent uses tools like YFinance to pull in stock-related "
-        "information such as current stock prices, analyst recommendations, company "
-        "financial fundamentals, and related news. It specializes in presenting this "
-        "information in easy-to-read tables, making it ideal for investors and analysts. "
-        "This agent is also capable of delivering company performance metrics, including "
-        "profitability ratios, market movements, and shareholder insights. It helps users "
-        "quickly assess market conditions and stock potential."
-    ),
-    tools=[YFinanceTools(stock_price=True, analyst_recommendations=True, stock_fundamentals=True, company_news=True)],
-    instructions=[
-        "Use tables to display stock prices, analyst recommendations, and key financial data.",
-        "Provide clear and well-organized summaries of any financial news or updates."
-    ],
-    show_tools_calls=True,
-    markdown=True,
-)
-
-# Multi Agent
-multi_agent = Agent(
-    team=[web_search_agent, financial_agent],
-    instructions=[
-        "Always include sources to ensure reliability.",
-        "Use tables to display stock prices and financial data whenever applicable.",
-        "Provide clear summaries combining both financial data and web-retrieved news."
-    ],
-    model=Groq(id="llama3-groq-70B-8192-tool-use-preview"),
-    description=(
-        "A collaborative agent team combining the expertise of both the Web Search Agent and "
-        "the Financial Agent. The Web Search Agent provides up-to-date news and real-time "
-        "information from online sources, while the Financial Agent retrieves stock data, "
-        "analyst recommendations, and company fundamentals. This multi-agent setup ensures "
-        "comprehensive coverage of both web and financial insights, making it ideal for use cases "
-        "that require detailed market analysis as well as real-time news updates."
-    ),
-    show_tools_calls=True,
-    markdown=True,
-)
-
-# Running the multi-agent for NVDA stock summary
-multi_agent.print_response("Summarize analyst recommendations and share the latest news for NVDA stock and detailed report also", stream=True)
+from phi.agent import Agent
+import groq
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Shared helpers live in common/ at the repository root
+ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.response_cache import cached_run, cached_stream, get_response_cache
+from common.routing import ModelRouter
+from common.search_cache import CachedDuckDuckGo
+from common.tracing import get_tracer
+from market_store import StoredYFinanceTools
+
+load_dotenv()
+groq.api_key = os.getenv("GROQ_API_KEY")
+
+# Spans for every agent run and tool call go to ~/.cache/ai-agents/traces
+get_tracer("financial")
+
+# Web Search Agent
+def build_web_search_agent(models=None):
+    return Agent(
+        name="Web Search Agent",
+        role="Search the web for information",
+        model=(models or ModelRouter()).model("financial.web_search_agent"),
+        description=(
+            "A dedicated agent designed to search and retrieve the latest information "
+            "from the web. Specializes in finding up-to-date news and online data "
+            "using various web-based tools. The agent leverages the DuckDuckGo search engine "
+            "to gather web information efficiently and is focused on returning relevant, "
+            "credible sources, ensuring that results are trustworthy. Ideal for retrieving "
+            "news articles, blogs, and real-time updates on a broad range of topics."
+        ),
+        tools=[CachedDuckDuckGo()],
+        instructions=[
+            "Always include sources to ensure reliability.",
+            "Provide concise summaries of the information found, including essential details."
+        ],
+        show_tools_calls=True,
+        markdown=True,
+    )
+
+
+# Financial Agent
+def build_financial_agent(models=None):
+    return Agent(
+        name="Financial Agent",
+        model=(models or ModelRouter()).model("financial.financial_agent"),
+        description=(
+            "An expert financial analysis agent focused on retrieving and presenting key "
+            "financial data. This agent uses tools like YFinance to pull in stock-related "
+            "information such as current stock prices, analyst recommendations, company "
+            "financial fundamentals, and related news. It specializes in presenting this "
+            "information in easy-to-read tables, making it ideal for investors and analysts. "
+            "This agent is also capable of delivering company performance metrics, including "
+            "profitability ratios, market movements, and shareholder insights. It helps users "
+            "quickly assess market conditions and stock potential."
+        ),
+        tools=[StoredYFinanceTools(stock_price=True, analyst_recommendations=True, stock_fundamentals=True, company_news=True)],
+        instructions=[
+            "Use tables to display stock prices, analyst recommendations, and key financial data.",
+            "Provide clear and well-organized summaries of any financial news or updates."
+        ],
+        show_tools_calls=True,
+        markdown=True,
+    )
+
+
+TEAM_DESCRIPTION = (
+    "A collaborative agent team combining the expertise of both the Web Search Agent and "
+    "the Financial Agent. The Web Search Agent provides up-to-date news and real-time "
+    "information from online sources, while the Financial Agent retrieves stock data, "
+    "analyst recommendations, and company fundamentals. This multi-agent setup ensures "
+    "comprehensive coverage of both web and financial insights, making it ideal for use cases "
+    "that require detailed market analysis as well as real-time news updates."
+)
+TEAM_INSTRUCTIONS = [
+    "Always include sources to ensure reliability.",
+    "Use tables to display stock prices and financial data whenever applicable.",
+    "Provide clear summaries combining both financial data and web-retrieved news."
+]
+
+
+# Multi Agent - the members pick tools on a small model, the coordinator writes the report on a large one
+def build_multi_agent(models=None):
+    models = models or ModelRouter()
+    return Agent(
+        team=[build_web_search_agent(models), build_financial_agent(models)],
+        instructions=TEAM_INSTRUCTIONS,
+        model=models.model("financial.coordinator"),
+        description=TEAM_DESCRIPTION,
+        show_tools_calls=True,
+        markdown=True,
+    )
+
+
+# Agents keep per-run state, so concurrent runs (see benchmarks/) build their own team. The shared
+# multi_agent, web_search_agent and financial_agent are built on first use, not when the module is imported
+_team = None
+_team_lock = threading.Lock()
+
+
+def __getattr__(name):
+    global _team
+    if name not in ("multi_agent", "web_search_agent", "financial_agent"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _team_lock:
+        if _team is None:
+            _team = build_multi_agent()
+    web_search_agent, financial_agent = _team.team
+    return {"multi_agent": _team, "web_search_agent": web_search_agent, "financial_agent": financial_agent}[name]
+
+# Seconds each member gets in run_team before its section of the report is marked partial
+MEMBER_TIMEOUTS = {"Web Search Agent": 45.0, "Financial Agent": 45.0}
+MEMBER_TASKS = {
+    "Web Search Agent": "Find the latest news and web coverage, with sources, needed for this request: {query}",
+    "Financial Agent": (
+        "Retrieve the stock prices, analyst recommendations, fundamentals and company news "
+        "needed for this request: {query}"
+    ),
+}
+
+
+# Coordinator for run_team - the same team lead as multi_agent, but it gets its members' answers
+# in the prompt instead of delegating to them one tool call at a time
+def build_coordinator(models=None):
+    return Agent(
+        name="Team Coordinator",
+        model=(models or ModelRouter()).model("financial.coordinator"),
+        description=TEAM_DESCRIPTION,
+        instructions=TEAM_INSTRUCTIONS + [
+            "Sections marked partial are missing or incomplete, say so in the matching part of the report."
+        ],
+        markdown=True,
+    )
+
+
+def delegate(query, models=None, cache=None, timeouts=None):
+    """Run every team member on its part of query at once, each until its own deadline.
+
+    Returns {member name: (content, error)} with error set when the member failed or
+    ran past its deadline. Members that time out keep running in the background, a
+    late answer is dropped.
+    """
+    models = models or ModelRouter()
+    timeouts = {**MEMBER_TIMEOUTS, **(timeouts or {})}
+    members = [build_web_search_agent(models), build_financial_agent(models)]
+    tracer = get_tracer()
+
+    def run(member, queued_at):
+        with tracer.span("delegate", kind="task", queued_at=queued_at, member=member.name):
+            return cached_run(member, MEMBER_TASKS[member.name].format(query=query), cache).content
+
+    pool = ThreadPoolExecutor(max_workers=len(members), thread_name_prefix="member")
+    started = time.monotonic()
+    # Each member runs in a copy of the caller's context so its spans and request priority carry over
+    futures = {
+        member.name: pool.submit(contextvars.copy_context().run, run, member, started) for member in members
+    }
+    results = {}
+    try:
+        for name, future in futures.items():
+            timeout = timeouts[name]
+            try:
+                results[name] = (future.result(timeout=max(0.0, started + timeout - time.monotonic())), None)
+            except FutureTimeoutError:
+                results[name] = (None, f"no answer within {timeout:g} seconds")
+            except Exception as e:
+                results[name] = (None, str(e) or type(e).__name__)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def build_team_prompt(query, results):
+    sections = [query, "Write the report from your team members' findings below."]
+    for name, (content, error) in results.items():
+        if error:
+            sections.append(f"## {name} (partial: {error})\n{content or 'Not available'}")
+        else:
+            sections.append(f"## {name}\n{content}")
+    return "\n\n".join(sections)
+
+
+def run_team(query, models=None, cache=None, timeouts=None, stream=False):
+    """Answer query with the team, running the members in parallel instead of one after the other.
+
+    The report takes about as long as the slower member plus the coordinator's
+    call, and a member past its deadline only leaves its section partial.
+    Returns the report, or a generator of its chunks when stream is set.
+    """
+    models = models or ModelRouter()
+    with get_tracer().span("team", kind="pipeline"):
+        prompt = build_team_prompt(query, delegate(query, models, cache, timeouts))
+    coordinator = build_coordinator(models)
+    if stream:
+        return cached_stream(coordinator, prompt, cache)
+    return cached_run(coordinator, prompt, cache).content
+
+
+# Report Agent - writes a report from market data that was fetched up front (see batch.py and prefetch.py),
+# so it needs no tools. Built per report because agents keep per-run state.
+def build_report_agent(models=None):
+    return Agent(
+        name="Report Agent",
+        model=(models or ModelRouter()).model("financial.report"),
+        description=(
+            "An expert financial analyst that writes stock reports from market data that has "
+            "already been collected: current price, recent daily prices, company fundamentals, "
+            "analyst recommendations and the latest news."
+        ),
+        instructions=[
+            "Always include sources to ensure reliability.",
+            "Use tables to display stock prices, analyst recommendations, and key financial data.",
+            "Provide clear and well-organized summaries of any financial news or updates.",
+            "Only use the data provided and say so when a section is not available.",
+        ],
+        markdown=True,
+    )
+
+
+REPORT_SECTIONS = (
+    ("Current price", "price"),
+    ("Recent daily prices", "history"),
+    ("Company fundamentals", "fundamentals"),
+    ("Analyst recommendations", "recommendations"),
+    ("Latest news", "news"),
+    ("Web news", "web_news"),
+)
+
+
+def build_report_prompt(snapshot):
+    sections = [
+        f"Summarize analyst recommendations and share the latest news for {snapshot['symbol']} stock "
+        "and detailed report also, using the following data."
+    ]
+    for title, key in REPORT_SECTIONS:
+        if key in snapshot:
+            body = json.dumps(snapshot[key], indent=2, default=str)
+        elif key in snapshot.get("errors", {}):
+            body = "Not available"
+        else:
+            continue
+        sections.append(f"## {title}\n{body}")
+    return "\n\n".join(sections)
+
+
+if __name__ == "__main__":
+    # Running the multi-agent for NVDA stock summary
+    query = "Summarize analyst recommendations and share the latest news for NVDA stock and detailed report also"
+    # Opt-in: repeated queries are answered from the local response cache (RESPONSE_CACHE_TTL seconds)
+    cache = get_response_cache() if os.getenv("RESPONSE_CACHE") else None
+    for delta in run_team(query, cache=cache, stream=True):
+        print(delta, end="", flush=True)
+    print()
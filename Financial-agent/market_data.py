@@ -0,0 +1,65 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from market_store import get_market_store
+
+logger = logging.getLogger(__name__)
+
+# Concurrent per-ticker lookups (fundamentals, recommendations, news)
+MAX_WORKERS = 8
+HISTORY_PERIOD = "5d"
+NEWS_STORIES = 3
+
+
+def history_records(frame):
+    return [
+        {
+            "date": index.strftime("%Y-%m-%d"),
+            "open": row["Open"],
+            "high": row["High"],
+            "low": row["Low"],
+            "close": row["Close"],
+            "volume": row["Volume"],
+        }
+        for index, row in frame.iterrows()
+    ]
+
+
+def snapshot_parts(store):
+    """(key, fetch) pairs for every part of a ticker snapshot, each fetch takes the symbol."""
+    return (
+        ("price", store.quote),
+        ("history", lambda symbol: history_records(store.history(symbol, HISTORY_PERIOD))),
+        ("fundamentals", store.fundamentals),
+        ("recommendations", store.recommendations),
+        ("news", lambda symbol: store.news(symbol)[:NEWS_STORIES]),
+    )
+
+
+def fetch_snapshot(symbol, store=None):
+    """Price, fundamentals, analyst recommendations and news for one ticker.
+
+    Everything is read through the market data store. Each part is fetched
+    independently, failures are recorded under "errors" and the remaining data
+    is still returned.
+    """
+    snapshot = {"symbol": symbol, "errors": {}}
+    for key, fetch in snapshot_parts(store or get_market_store()):
+        try:
+            snapshot[key] = fetch(symbol)
+        except Exception as e:
+            snapshot["errors"][key] = str(e)
+    return snapshot
+
+
+def fetch_snapshots(tickers, max_workers=MAX_WORKERS, store=None):
+    """Fetch snapshots for a watchlist: one bulk price refresh plus capped parallel lookups."""
+    store = store or get_market_store()
+    try:
+        store.update_histories(tickers, HISTORY_PERIOD)
+    except Exception as e:
+        logger.warning("Bulk price download failed: %s", e)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yfinance") as pool:
+        snapshots = pool.map(lambda ticker: fetch_snapshot(ticker, store), tickers)
+        return dict(zip(tickers, snapshots))
@@ -0,0 +1,381 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+from phi.tools.yfinance import YFinanceTools
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = Path(os.getenv("MARKET_DATA_DIR", Path.home() / ".cache" / "ai-agents" / "market-data"))
+OFFLINE = os.getenv("MARKET_DATA_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# Seconds before each kind of data is fetched again
+REFRESH_INTERVALS = {
+    "history": 15 * 60,
+    "quote": 60,
+    "info": 24 * 3600,
+    "recommendations": 6 * 3600,
+    "news": 30 * 60,
+}
+DEFAULT_HISTORY_PERIOD = "1y"
+# Backfill only when the stored history covers from more than this many days after the requested start,
+# weekends and holidays make the first trading day drift a little
+BACKFILL_SLACK_DAYS = 7
+
+
+def period_start(period, end):
+    if period == "max":
+        return None
+    if period == "ytd":
+        return end.replace(month=1, day=1)
+    for suffix, unit in (("mo", "months"), ("wk", "weeks"), ("d", "days"), ("y", "years")):
+        if period.endswith(suffix):
+            return end - pd.DateOffset(**{unit: int(period[: -len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def _naive(value):
+    # yfinance returns bars in the exchange timezone, periods are compared in local naive time
+    return value.tz_localize(None) if value.tz is not None else value
+
+
+def get_fundamentals(symbol, info):
+    return {
+        "symbol": symbol,
+        "company_name": info.get("longName", ""),
+        "sector": info.get("sector", ""),
+        "industry": info.get("industry", ""),
+        "market_cap": info.get("marketCap", "N/A"),
+        "pe_ratio": info.get("forwardPE", "N/A"),
+        "pb_ratio": info.get("priceToBook", "N/A"),
+        "dividend_yield": info.get("dividendYield", "N/A"),
+        "eps": info.get("trailingEps", "N/A"),
+        "beta": info.get("beta", "N/A"),
+        "52_week_high": info.get("fiftyTwoWeekHigh", "N/A"),
+        "52_week_low": info.get("fiftyTwoWeekLow", "N/A"),
+    }
+
+
+def download_history(tickers, **kwargs):
+    """Daily bars for several tickers from one bulk yf.download call, keyed by ticker."""
+    data = yf.download(
+        tickers, interval="1d", group_by="ticker", threads=True, progress=False, auto_adjust=False, **kwargs
+    )
+    frames = {}
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker]
+        else:
+            frame = data
+        frames[ticker] = frame.dropna(how="all")
+    return frames
+
+
+def _atomic_write(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+class MarketDataStore:
+    """Local per-ticker store of Yahoo Finance data.
+
+    Daily price history is kept as one Parquet file per ticker and only the days
+    after the last stored bar are downloaded on refresh. Quotes, company info,
+    analyst recommendations and news are JSON records with their own refresh
+    intervals. In offline mode nothing is fetched and only stored data is served.
+    """
+
+    def __init__(self, directory=STORE_DIR, offline=OFFLINE, refresh_intervals=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.offline = offline
+        self.refresh_intervals = {**REFRESH_INTERVALS, **(refresh_intervals or {})}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, symbol, kind="history"):
+        # Symbols are stored upper-cased, so "nvda" and "NVDA" must share their locks as well
+        with self._locks_lock:
+            return self._locks.setdefault((symbol.upper(), kind), threading.Lock())
+
+    def _symbol_dir(self, symbol):
+        path = self.directory / symbol.upper()
+        path.mkdir(exist_ok=True)
+        return path
+
+    def _is_fresh(self, path, kind):
+        with suppress(OSError):
+            return time.time() - path.stat().st_mtime < self.refresh_intervals[kind]
+        return False
+
+    # Price history
+
+    def _history_path(self, symbol):
+        return self._symbol_dir(symbol) / "history.parquet"
+
+    def _coverage_path(self, symbol):
+        return self._symbol_dir(symbol) / "history.json"
+
+    def load_history(self, symbol):
+        path = self._history_path(symbol)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path)
+
+    def _needs_backfill(self, symbol, stored, start):
+        """Whether the period from start goes back further than the history downloaded so far.
+
+        The start of every full-period download is recorded next to the history, a
+        ticker listed after that start (a recent IPO) has no older bars to fetch.
+        Histories without that record are judged by their first bar.
+        """
+        try:
+            covered = json.loads(self._coverage_path(symbol).read_text(encoding="utf-8"))["start"]
+        except (OSError, ValueError, KeyError):
+            covered = _naive(stored.index).min()
+        else:
+            if covered is None:
+                # The whole listing was downloaded
+                return False
+            covered = pd.Timestamp(covered)
+        return start is None or covered > start + pd.Timedelta(days=BACKFILL_SLACK_DAYS)
+
+    def _save_coverage(self, symbol, start):
+        # None when the period was "max"
+        payload = json.dumps({"start": None if start is None else start.isoformat()})
+        _atomic_write(
+            self._coverage_path(symbol), lambda tmp_path: Path(tmp_path).write_text(payload, encoding="utf-8")
+        )
+
+    def _save_history(self, symbol, stored, fetched):
+        frames = [frame for frame in (stored, fetched) if frame is not None and not frame.empty]
+        if not frames:
+            return stored
+        merged = pd.concat(frames)
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        _atomic_write(self._history_path(symbol), merged.to_parquet)
+        return merged
+
+    def save_history(self, symbol, frame):
+        """Merge daily bars into the stored history, e.g. bars imported from another source."""
+        with self._lock(symbol):
+            return self._save_history(symbol, self.load_history(symbol), frame)
+
+    def update_histories(self, symbols, period=DEFAULT_HISTORY_PERIOD):
+        """Bring the stored history of several tickers up to date with as few bulk downloads as possible."""
+        if self.offline:
+            return
+        now = pd.Timestamp.now()
+        start = period_start(period, now)
+        missing, stale = [], {}
+        for symbol in symbols:
+            stored = self.load_history(symbol)
+            if stored is None or stored.empty:
+                missing.append(symbol)
+            elif self._needs_backfill(symbol, stored, start):
+                # Stored range is too short for this period, fetch the whole period again
+                missing.append(symbol)
+            elif not self._is_fresh(self._history_path(symbol), "history"):
+                stale[symbol] = stored
+
+        if missing:
+            for symbol, frame in download_history(missing, period=period).items():
+                with self._lock(symbol):
+                    self._save_history(symbol, self.load_history(symbol), frame)
+                    self._save_coverage(symbol, start)
+        if stale:
+            # Re-download from the oldest last bar so today's partial bar gets replaced too
+            since = min(frame.index.max() for frame in stale.values()).strftime("%Y-%m-%d")
+            for symbol, frame in download_history(list(stale), start=since).items():
+                with self._lock(symbol):
+                    self._save_history(symbol, stale[symbol], frame)
+            # Touch tickers with no new bars so they aren't downloaded again until the next interval
+            for symbol in stale:
+                with suppress(OSError):
+                    os.utime(self._history_path(symbol))
+
+    def history(self, symbol, period=DEFAULT_HISTORY_PERIOD):
+        self.update_histories([symbol], period)
+        stored = self.load_history(symbol)
+        if stored is None or stored.empty:
+            raise LookupError(f"No price history stored for {symbol}")
+        start = period_start(period, pd.Timestamp.now())
+        if start is None:
+            return stored
+        return stored[_naive(stored.index) >= start]
+
+    # Records
+
+    def record(self, symbol, kind, fetch):
+        """Return the stored record, calling fetch when it is missing or older than its refresh interval."""
+        path = self._symbol_dir(symbol) / f"{kind}.json"
+        with self._lock(symbol, kind):
+            stored = None
+            with suppress(OSError, ValueError):
+                stored = json.loads(path.read_text(encoding="utf-8"))["data"]
+            if stored is not None and (self.offline or self._is_fresh(path, kind)):
+                return stored
+            if self.offline:
+                raise LookupError(f"No {kind} stored for {symbol}")
+
+            try:
+                data = fetch()
+            except Exception as e:
+                if stored is None:
+                    raise
+                logger.warning("Refreshing %s for %s failed, serving stored data: %s", kind, symbol, e)
+                return stored
+
+            payload = json.dumps({"symbol": symbol, "fetched_at": time.time(), "data": data}, default=str)
+            _atomic_write(path, lambda tmp_path: Path(tmp_path).write_text(payload, encoding="utf-8"))
+            return data
+
+    def quote(self, symbol):
+        return self.record(symbol, "quote", lambda: yf.Ticker(symbol).fast_info["lastPrice"])
+
+    def info(self, symbol):
+        return self.record(symbol, "info", lambda: yf.Ticker(symbol).info)
+
+    def fundamentals(self, symbol):
+        return get_fundamentals(symbol, self.info(symbol))
+
+    def recommendations(self, symbol):
+        def fetch():
+            recommendations = yf.Ticker(symbol).recommendations
+            if recommendations is None or recommendations.empty:
+                return []
+            return recommendations.to_dict(orient="records")
+
+        return self.record(symbol, "recommendations", fetch)
+
+    def news(self, symbol):
+        return self.record(symbol, "news", lambda: yf.Ticker(symbol).news)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_market_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MarketDataStore()
+        return _default_store
+
+
+class StoredYFinanceTools(YFinanceTools):
+    """YFinanceTools that read from a MarketDataStore before calling Yahoo Finance."""
+
+    def __init__(self, store=None, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store or get_market_store()
+
+    def get_current_stock_price(self, symbol: str) -> str:
+        """
+        Use this function to get the current stock price for a given symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            str: The current stock price or error message.
+        """
+        try:
+            return f"{self.store.quote(symbol):.4f}"
+        except Exception as e:
+            return f"Error fetching current price for {symbol}: {e}"
+
+    def get_historical_stock_prices(self, symbol: str, period: str = "1mo", interval: str = "1d") -> str:
+        """
+        Use this function to get the historical stock price for a given symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+            period (str): The period for which to retrieve historical prices. Defaults to "1mo".
+                        Valid periods: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
+            interval (str): The interval between data points. Defaults to "1d".
+                        Valid intervals: 1d,5d,1wk,1mo,3mo
+
+        Returns:
+          str: The current stock price or error message.
+        """
+        if interval != "1d":
+            # Only daily bars are stored
+            return super().get_historical_stock_prices(symbol, period, interval)
+        try:
+            return self.store.history(symbol, period).to_json(orient="index")
+        except Exception as e:
+            return f"Error fetching historical prices for {symbol}: {e}"
+
+    def get_stock_fundamentals(self, symbol: str) -> str:
+        """Use this function to get fundamental data for a given stock symbol yfinance API.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            str: A JSON string containing fundamental data or an error message.
+                Keys:
+                    - 'symbol': The stock symbol.
+                    - 'company_name': The long name of the company.
+                    - 'sector': The sector to which the company belongs.
+                    - 'industry': The industry to which the company belongs.
+                    - 'market_cap': The market capitalization of the company.
+                    - 'pe_ratio': The forward price-to-earnings ratio.
+                    - 'pb_ratio': The price-to-book ratio.
+                    - 'dividend_yield': The dividend yield.
+                    - 'eps': The trailing earnings per share.
+                    - 'beta': The beta value of the stock.
+                    - '52_week_high': The 52-week high price of the stock.
+                    - '52_week_low': The 52-week low price of the stock.
+        """
+        try:
+            return json.dumps(self.store.fundamentals(symbol), indent=2, default=str)
+        except Exception as e:
+            return f"Error getting fundamentals for {symbol}: {e}"
+
+    def get_analyst_recommendations(self, symbol: str) -> str:
+        """Use this function to get analyst recommendations for a given stock symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            str: JSON containing analyst recommendations.
+        """
+        try:
+            return json.dumps(self.store.recommendations(symbol), indent=2, default=str)
+        except Exception as e:
+            return f"Error fetching analyst recommendations for {symbol}: {e}"
+
+    def get_company_news(self, symbol: str, num_stories: int = 3) -> str:
+        """Use this function to get company news and press releases for a given stock symbol.
+
+        Args:
+            symbol (str): The stock symbol.
+            num_stories (int): The number of news stories to return. Defaults to 3.
+
+        Returns:
+            str: JSON containing company news and press releases.
+        """
+        try:
+            return json.dumps(self.store.news(symbol)[:num_stories], indent=2, default=str)
+        except Exception as e:
+            return f"Error fetching company news for {symbol}: {e}"
@@ -0,0 +1,77 @@
+import argparse
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# financial_agent puts the repository root on sys.path, so it has to be imported before common
+from financial_agent import build_report_agent, build_report_prompt
+from common.response_cache import cached_run
+from common.search_cache import CachedDuckDuckGo
+from common.tracing import get_tracer, trace_agent
+from market_data import snapshot_parts
+from market_store import get_market_store
+
+WEB_NEWS_RESULTS = 5
+
+
+def prefetch_snapshot(symbol, store=None, search_tool=None):
+    """Issue every tool call the team would make for a ticker at once.
+
+    Yahoo Finance lookups and the DuckDuckGo news search run in parallel, so the
+    data is ready before the first model call instead of being requested one tool
+    call per model round trip.
+    """
+    store = store or get_market_store()
+    search_tool = search_tool or CachedDuckDuckGo()
+
+    def web_news(symbol):
+        results = search_tool.duckduckgo_news(f"{symbol} stock", max_results=WEB_NEWS_RESULTS)
+        try:
+            return json.loads(results)
+        except ValueError:
+            return results
+
+    calls = dict(snapshot_parts(store))
+    calls["web_news"] = web_news
+
+    def traced(key, fetch, queued_at):
+        with get_tracer().span(key, kind="tool", queued_at=queued_at):
+            return fetch(symbol)
+
+    snapshot = {"symbol": symbol, "errors": {}}
+    with ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="prefetch") as pool:
+        futures = {
+            key: pool.submit(contextvars.copy_context().run, traced, key, fetch, time.monotonic())
+            for key, fetch in calls.items()
+        }
+        for key, future in futures.items():
+            try:
+                snapshot[key] = future.result()
+            except Exception as e:
+                snapshot["errors"][key] = str(e)
+    return snapshot
+
+
+def prefetch_report(symbol):
+    """Write the full report with a single model call over the prefetched data."""
+    return cached_run(build_report_agent(), build_report_prompt(prefetch_snapshot(symbol)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prefetch all market data and news for a ticker, then write the report in one model call."
+    )
+    parser.add_argument("ticker", nargs="?", default="NVDA", help="Ticker symbol (default: NVDA)")
+    args = parser.parse_args()
+
+    symbol = args.ticker.upper()
+    report_agent = build_report_agent()
+    with get_tracer().span("prefetch_report", kind="task", symbol=symbol):
+        prompt = build_report_prompt(prefetch_snapshot(symbol))
+        with trace_agent(report_agent, stream=True):
+            report_agent.print_response(prompt, stream=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,332 +1,360 @@
-import streamlit as st
-from phi.agent import Agent
-from phi.model.google import Gemini
-
-st.set_page_config(
-    page_title="AI Health & Fitness Planner",
-    page_icon="🏋️‍♂️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Enhanced UI styling
-st.markdown("""
-    <style>
-    .main {
-        padding: 2rem;
-        background-color: #f8f9fa;
-    }
-    .stButton>button {
-        width: 100%;
-        border-radius: 10px;
-        height: 3.5em;
-        background-color: #4CAF50;
-        color: white;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #45a049;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    .success-box {
-        padding: 1.5rem;
-        border-radius: 10px;
-        background-color: #f0fff4;
-        border: 1px solid #9ae6b4;
-        margin: 1rem 0;
-    }
-    .warning-box {
-        padding: 1.5rem;
-        border-radius: 10px;
-        background-color: #fffaf0;
-        border: 1px solid #fbd38d;
-        margin: 1rem 0;
-    }
-    .stExpander {
-        background-color: white;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
-        margin: 1rem 0;
-    }
-    div[data-testid="stExpander"] div[role="button"] p {
-        font-size: 1.2rem;
-        font-weight: 600;
-        color: #2d3748;
-    }
-    .stTextInput>div>div>input {
-        border-radius: 8px;
-    }
-    .stSelectbox>div>div>div {
-        border-radius: 8px;
-    }
-    .stNumberInput>div>div>input {
-        border-radius: 8px;
-    }
-    .info-card {
-        background-color: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
-        margin: 1rem 0;
-    }
-    .header-container {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 15px;
-        color: white;
-        margin-bottom: 2rem;
-        text-align: center;
-    }
-    .sidebar-content {
-        background-color: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-def display_dietary_plan(plan_content):
-    with st.expander("📋 Your Personalized Dietary Plan", expanded=True):
-        st.markdown('<div class="info-card">', unsafe_allow_html=True)
-        
-        st.markdown("### 🎯 Why This Plan Works For You")
-        st.info(plan_content.get("why_this_plan_works", "Information not available"))
-        
-        st.markdown("### 🍽️ Your Daily Meal Plan")
-        st.markdown(f"""
-        <div style='background-color: #f8fafc; padding: 1.5rem; border-radius: 10px; margin: 1rem 0;'>
-            {plan_content.get("meal_plan", "Plan not available")}
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("### ⚠️ Health Considerations")
-        considerations = plan_content.get("important_considerations", "").split('\n')
-        cols = st.columns(2)
-        for idx, consideration in enumerate(considerations):
-            if consideration.strip():
-                cols[idx % 2].warning(consideration)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-
-def display_fitness_plan(plan_content):
-    with st.expander("💪 Your Personalized Fitness Plan", expanded=True):
-        st.markdown('<div class="info-card">', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns([2, 1])
-        with col1:
-            st.markdown("### 🎯 Your Fitness Goals")
-            st.success(plan_content.get("goals", "Goals not specified"))
-            
-            st.markdown("### 🏋️‍♂️ Workout Routine")
-            st.markdown(f"""
-            <div style='background-color: #f8fafc; padding: 1.5rem; border-radius: 10px; margin: 1rem 0;'>
-                {plan_content.get("routine", "Routine not available")}
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown("### 💡 Training Tips")
-            tips = plan_content.get("tips", "").split('\n')
-            for tip in tips:
-                if tip.strip():
-                    st.info(tip)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-
-def main():
-    if 'dietary_plan' not in st.session_state:
-        st.session_state.dietary_plan = {}
-        st.session_state.fitness_plan = {}
-        st.session_state.qa_pairs = []
-        st.session_state.plans_generated = False
-
-    # Header with gradient background
-    st.markdown("""
-        <div class="header-container">
-            <h1>🏋️‍♂️ AI Health & Fitness Planner</h1>
-            <p style='font-size: 1.2rem; margin-top: 1rem;'>
-                Get personalized dietary and fitness plans powered by AI, tailored specifically to your goals and preferences.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-
-    # Sidebar with improved styling
-    with st.sidebar:
-        st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
-        st.markdown("### 🔑 API Configuration")
-        gemini_api_key = st.text_input(
-            "Gemini API Key",
-            type="password",
-            help="Enter your Gemini API key to access the service"
-        )
-        
-        if not gemini_api_key:
-            st.warning("⚠️ Please enter your Gemini API Key to proceed")
-            st.markdown("[Get your API key here](https://aistudio.google.com/apikey)")
-            st.markdown('</div>', unsafe_allow_html=True)
-            return
-        
-        st.success("✅ API Key verified!")
-        st.markdown('</div>', unsafe_allow_html=True)
-
-    if gemini_api_key:
-        try:
-            gemini_model = Gemini(id="gemini-1.5-flash", api_key=gemini_api_key)
-        except Exception as e:
-            st.error(f"❌ Error initializing Gemini model: {e}")
-            return
-
-        st.markdown("## 👤 Your Profile")
-        st.markdown('<div class="info-card">', unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            age = st.number_input("Age", min_value=10, max_value=100, step=1, help="Enter your age")
-            height = st.number_input("Height (cm)", min_value=100.0, max_value=250.0, step=0.1)
-            sex = st.selectbox("Sex", options=["Male", "Female", "Other"])
-
-        with col2:
-            weight = st.number_input("Weight (kg)", min_value=20.0, max_value=300.0, step=0.1)
-            activity_level = st.selectbox(
-                "Activity Level",
-                options=["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active"],
-                help="Choose your typical activity level"
-            )
-            dietary_preferences = st.selectbox(
-                "Dietary Preferences",
-                options=["Vegetarian", "Keto", "Gluten Free", "Low Carb", "Dairy Free"],
-                help="Select your dietary preference"
-            )
-
-        with col3:
-            fitness_goals = st.selectbox(
-                "Fitness Goals",
-                options=["Lose Weight", "Gain Muscle", "Endurance", "Stay Fit", "Strength Training"],
-                help="What do you want to achieve?"
-            )
-            
-            st.markdown("<br>" * 3, unsafe_allow_html=True)
-            if st.button("🎯 Generate My Plan", use_container_width=True):
-                with st.spinner("Creating your perfect health and fitness routine..."):
-                    try:
-                        dietary_agent = Agent(
-                            name="Dietary Expert",
-                            role="Provides personalized dietary recommendations",
-                            model=gemini_model,
-                            instructions=[
-                                "Consider the user's input, including dietary restrictions and preferences.",
-                                "Suggest a detailed meal plan for the day, including breakfast, lunch, dinner, and snacks.",
-                                "Provide a brief explanation of why the plan is suited to the user's goals.",
-                                "Focus on clarity, coherence, and quality of the recommendations.",
-                            ]
-                        )
-
-                        fitness_agent = Agent(
-                            name="Fitness Expert",
-                            role="Provides personalized fitness recommendations",
-                            model=gemini_model,
-                            instructions=[
-                                "Provide exercises tailored to the user's goals.",
-                                "Include warm-up, main workout, and cool-down exercises.",
-                                "Explain the benefits of each recommended exercise.",
-                                "Ensure the plan is actionable and detailed.",
-                            ]
-                        )
-
-                        user_profile = f"""
-                        Age: {age}
-                        Weight: {weight}kg
-                        Height: {height}cm
-                        Sex: {sex}
-                        Activity Level: {activity_level}
-                        Dietary Preferences: {dietary_preferences}
-                        Fitness Goals: {fitness_goals}
-                        """
-
-                        dietary_plan_response = dietary_agent.run(user_profile)
-                        dietary_plan = {
-                            "why_this_plan_works": "High Protein, Healthy Fats, Moderate Carbohydrates, and Caloric Balance",
-                            "meal_plan": dietary_plan_response.content,
-                            "important_considerations": """
-                            - Hydration: Drink plenty of water throughout the day
-                            - Electrolytes: Monitor sodium, potassium, and magnesium levels
-                            - Fiber: Ensure adequate intake through vegetables and fruits
-                            - Listen to your body: Adjust portion sizes as needed
-                            """
-                        }
-
-                        fitness_plan_response = fitness_agent.run(user_profile)
-                        fitness_plan = {
-                            "goals": "Build strength, improve endurance, and maintain overall fitness",
-                            "routine": fitness_plan_response.content,
-                            "tips": """
-                            - Track your progress regularly
-                            - Allow proper rest between workouts
-                            - Focus on proper form
-                            - Stay consistent with your routine
-                            """
-                        }
-
-                        st.session_state.dietary_plan = dietary_plan
-                        st.session_state.fitness_plan = fitness_plan
-                        st.session_state.plans_generated = True
-                        st.session_state.qa_pairs = []
-
-                    except Exception as e:
-                        st.error(f"❌ An error occurred: {e}")
-
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        if st.session_state.plans_generated:
-            display_dietary_plan(st.session_state.dietary_plan)
-            display_fitness_plan(st.session_state.fitness_plan)
-
-            st.markdown("## ❓ Questions About Your Plan")
-            st.markdown('<div class="info-card">', unsafe_allow_html=True)
-            
-            col1, col2 = st.columns([4, 1])
-            with col1:
-                question_input = st.text_input("What would you like to know?", placeholder="Type your question here...")
-            with col2:
-                ask_button = st.button("Ask Question", use_container_width=True)
-
-            if ask_button and question_input:
-                with st.spinner("Finding the best answer for you..."):
-                    dietary_plan = st.session_state.dietary_plan
-                    fitness_plan = st.session_state.fitness_plan
-
-                    context = f"Dietary Plan: {dietary_plan.get('meal_plan', '')}\n\nFitness Plan: {fitness_plan.get('routine', '')}"
-                    full_context = f"{context}\nUser Question: {question_input}"
-
-                    try:
-                        agent = Agent(model=gemini_model, show_tool_calls=True, markdown=True)
-                        run_response = agent.run(full_context)
-
-                        if hasattr(run_response, 'content'):
-                            answer = run_response.content
-                        else:
-                            answer = "Sorry, I couldn't generate a response at this time."
-
-                        st.session_state.qa_pairs.append((question_input, answer))
-                    except Exception as e:
-                        st.error(f"❌ An error occurred while getting the answer: {e}")
-
-            if st.session_state.qa_pairs:
-                st.markdown("### 💬 Previous Questions & Answers")
-                for idx, (question, answer) in enumerate(st.session_state.qa_pairs):
-                    with st.container():
-                        st.markdown(f"""
-                        <div style='background-color: #f8fafc; padding: 1rem; border-radius: 10px; margin: 0.5rem 0;'>
-                            <p style='color: #4a5568; margin-bottom: 0.5rem;'><strong>Q: {question}</strong></p>
-                            <p style='color: #2d3748;'>A: {answer}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
-
-if __name__ == "__main__":
+import sys
+from pathlib import Path
+
+import streamlit as st
+from phi.model.google import Gemini
+
+# Shared helpers live in common/ at the repository root
+ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.response_cache import get_response_cache
+from common.tracing import get_tracer
+from plan_cache import bucket_profile, bucketed_user_profile, get_plan_store, profile_key
+from planner import (
+    ACTIVITY_LEVELS, DIETARY_PREFERENCES, FITNESS_GOALS, MODEL_ID, SEXES, build_user_profile, generate_plans
+)
+from qa import PlanQA
+
+# Spans for every agent run go to ~/.cache/ai-agents/traces
+get_tracer("health")
+
+st.set_page_config(
+    page_title="AI Health & Fitness Planner",
+    page_icon="🏋️‍♂️",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Enhanced UI styling
+st.markdown("""
+    <style>
+    .main {
+        padding: 2rem;
+        background-color: #f8f9fa;
+    }
+    .stButton>button {
+        width: 100%;
+        border-radius: 10px;
+        height: 3.5em;
+        background-color: #4CAF50;
+        color: white;
+        font-weight: 600;
+        transition: all 0.3s ease;
+    }
+    .stButton>button:hover {
+        background-color: #45a049;
+        transform: translateY(-2px);
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    }
+    .success-box {
+        padding: 1.5rem;
+        border-radius: 10px;
+        background-color: #f0fff4;
+        border: 1px solid #9ae6b4;
+        margin: 1rem 0;
+    }
+    .warning-box {
+        padding: 1.5rem;
+        border-radius: 10px;
+        background-color: #fffaf0;
+        border: 1px solid #fbd38d;
+        margin: 1rem 0;
+    }
+    .stExpander {
+        background-color: white;
+        border-radius: 10px;
+        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
+        margin: 1rem 0;
+    }
+    div[data-testid="stExpander"] div[role="button"] p {
+        font-size: 1.2rem;
+        font-weight: 600;
+        color: #2d3748;
+    }
+    .stTextInput>div>div>input {
+        border-radius: 8px;
+    }
+    .stSelectbox>div>div>div {
+        border-radius: 8px;
+    }
+    .stNumberInput>div>div>input {
+        border-radius: 8px;
+    }
+    .info-card {
+        background-color: white;
+        padding: 1.5rem;
+        border-radius: 10px;
+        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
+        margin: 1rem 0;
+    }
+    .header-container {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 2rem;
+        border-radius: 15px;
+        color: white;
+        margin-bottom: 2rem;
+        text-align: center;
+    }
+    .sidebar-content {
+        background-color: white;
+        padding: 1.5rem;
+        border-radius: 10px;
+        margin: 1rem 0;
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+def display_dietary_plan(plan_content):
+    with st.expander("📋 Your Personalized Dietary Plan", expanded=True):
+        st.markdown('<div class="info-card">', unsafe_allow_html=True)
+        
+        st.markdown("### 🎯 Why This Plan Works For You")
+        st.info(plan_content.get("why_this_plan_works", "Information not available"))
+        
+        st.markdown("### 🍽️ Your Daily Meal Plan")
+        st.markdown(f"""
+        <div style='background-color: #f8fafc; padding: 1.5rem; border-radius: 10px; margin: 1rem 0;'>
+            {plan_content.get("meal_plan", "Plan not available")}
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("### ⚠️ Health Considerations")
+        considerations = plan_content.get("important_considerations", "").split('\n')
+        cols = st.columns(2)
+        for idx, consideration in enumerate(considerations):
+            if consideration.strip():
+                cols[idx % 2].warning(consideration)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def display_fitness_plan(plan_content):
+    with st.expander("💪 Your Personalized Fitness Plan", expanded=True):
+        st.markdown('<div class="info-card">', unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            st.markdown("### 🎯 Your Fitness Goals")
+            st.success(plan_content.get("goals", "Goals not specified"))
+            
+            st.markdown("### 🏋️‍♂️ Workout Routine")
+            st.markdown(f"""
+            <div style='background-color: #f8fafc; padding: 1.5rem; border-radius: 10px; margin: 1rem 0;'>
+                {plan_content.get("routine", "Routine not available")}
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown("### 💡 Training Tips")
+            tips = plan_content.get("tips", "").split('\n')
+            for tip in tips:
+                if tip.strip():
+                    st.info(tip)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def main():
+    if 'dietary_plan' not in st.session_state:
+        st.session_state.dietary_plan = {}
+        st.session_state.fitness_plan = {}
+        st.session_state.qa_pairs = []
+        st.session_state.plan_qa = None
+        st.session_state.plans_generated = False
+
+    # Header with gradient background
+    st.markdown("""
+        <div class="header-container">
+            <h1>🏋️‍♂️ AI Health & Fitness Planner</h1>
+            <p style='font-size: 1.2rem; margin-top: 1rem;'>
+                Get personalized dietary and fitness plans powered by AI, tailored specifically to your goals and preferences.
+            </p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Sidebar with improved styling
+    with st.sidebar:
+        st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
+        st.markdown("### 🔑 API Configuration")
+        gemini_api_key = st.text_input(
+            "Gemini API Key",
+            type="password",
+            help="Enter your Gemini API key to access the service"
+        )
+        
+        if not gemini_api_key:
+            st.warning("⚠️ Please enter your Gemini API Key to proceed")
+            st.markdown("[Get your API key here](https://aistudio.google.com/apikey)")
+            st.markdown('</div>', unsafe_allow_html=True)
+            return
+        
+        st.success("✅ API Key verified!")
+        use_response_cache = st.checkbox(
+            "Reuse cached plans and answers",
+            value=True,
+            help="Serve identical requests from the local response cache instead of calling Gemini again"
+        )
+        use_plan_store = st.checkbox(
+            "Share plans between similar profiles",
+            value=False,
+            help="Round age, height and weight to ranges and serve plans generated for the same ranges, "
+                 "including ones precomputed with plan_cache.py"
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    response_cache = get_response_cache() if use_response_cache else None
+
+    if gemini_api_key:
+        try:
+            gemini_model = Gemini(id=MODEL_ID, api_key=gemini_api_key)
+        except Exception as e:
+            st.error(f"❌ Error initializing Gemini model: {e}")
+            return
+
+        st.markdown("## 👤 Your Profile")
+        st.markdown('<div class="info-card">', unsafe_allow_html=True)
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            age = st.number_input("Age", min_value=10, max_value=100, step=1, help="Enter your age")
+            height = st.number_input("Height (cm)", min_value=100.0, max_value=250.0, step=0.1)
+            sex = st.selectbox("Sex", options=SEXES)
+
+        with col2:
+            weight = st.number_input("Weight (kg)", min_value=20.0, max_value=300.0, step=0.1)
+            activity_level = st.selectbox(
+                "Activity Level",
+                options=ACTIVITY_LEVELS,
+                help="Choose your typical activity level"
+            )
+            dietary_preferences = st.selectbox(
+                "Dietary Preferences",
+                options=DIETARY_PREFERENCES,
+                help="Select your dietary preference"
+            )
+
+        with col3:
+            fitness_goals = st.selectbox(
+                "Fitness Goals",
+                options=FITNESS_GOALS,
+                help="What do you want to achieve?"
+            )
+            
+            st.markdown("<br>" * 3, unsafe_allow_html=True)
+            generate_clicked = st.button("🎯 Generate My Plan", use_container_width=True)
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        # Each plan gets its own slot so it can be shown as soon as its agent is done
+        plan_slots = {"dietary": st.empty(), "fitness": st.empty()}
+        plan_displays = {"dietary": display_dietary_plan, "fitness": display_fitness_plan}
+        rendered = set()
+
+        if generate_clicked:
+            user_profile = build_user_profile(
+                age, weight, height, sex, activity_level, dietary_preferences, fitness_goals
+            )
+            st.session_state.dietary_plan = {}
+            st.session_state.fitness_plan = {}
+            st.session_state.qa_pairs = []
+            st.session_state.plan_qa = None
+
+            stored_plans = plan_key = None
+            if use_plan_store:
+                bucketed = bucket_profile({
+                    "age": age, "weight": weight, "height": height, "sex": sex, "activity_level": activity_level,
+                    "dietary_preferences": dietary_preferences, "fitness_goals": fitness_goals,
+                })
+                plan_key = profile_key(bucketed, gemini_model.id)
+                stored_plans = get_plan_store().get(plan_key)
+                # Plans are generated for the whole range so they can be stored for the next similar profile
+                user_profile = bucketed_user_profile(bucketed)
+
+            if stored_plans:
+                st.caption(
+                    f"⚡ Plans shared with similar profiles: age {bucketed['age']}, "
+                    f"height {bucketed['height']} cm, weight {bucketed['weight']} kg"
+                )
+                for kind, plan in stored_plans.items():
+                    st.session_state[f"{kind}_plan"] = plan
+                    with plan_slots[kind].container():
+                        plan_displays[kind](plan)
+                    rendered.add(kind)
+            else:
+                with st.spinner("Creating your perfect health and fitness routine..."):
+                    drafts = {kind: "" for kind in plan_slots}
+                    for kind, event, value in generate_plans(gemini_model, user_profile, response_cache):
+                        if event == "delta":
+                            # Show the plan text as it streams in, the full layout replaces it when done
+                            drafts[kind] += value
+                            plan_slots[kind].markdown(drafts[kind] + "▌")
+                        elif event == "error":
+                            plan_slots[kind].empty()
+                            st.error(f"❌ An error occurred while creating your {kind} plan: {value}")
+                        else:
+                            st.session_state[f"{kind}_plan"] = value
+                            with plan_slots[kind].container():
+                                plan_displays[kind](value)
+                            rendered.add(kind)
+                if plan_key and st.session_state.dietary_plan and st.session_state.fitness_plan:
+                    get_plan_store().put(
+                        plan_key, {"dietary": st.session_state.dietary_plan, "fitness": st.session_state.fitness_plan}
+                    )
+
+            st.session_state.plans_generated = bool(st.session_state.dietary_plan or st.session_state.fitness_plan)
+
+        if st.session_state.plans_generated:
+            for kind in plan_slots:
+                plan = st.session_state[f"{kind}_plan"]
+                if plan and kind not in rendered:
+                    with plan_slots[kind].container():
+                        plan_displays[kind](plan)
+
+            st.markdown("## ❓ Questions About Your Plan")
+            st.markdown('<div class="info-card">', unsafe_allow_html=True)
+            
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                question_input = st.text_input("What would you like to know?", placeholder="Type your question here...")
+            with col2:
+                ask_button = st.button("Ask Question", use_container_width=True)
+
+            if ask_button and question_input:
+                with st.spinner("Finding the best answer for you..."):
+                    # One Q&A engine per set of plans, it keeps the plan overview and conversation summary
+                    if st.session_state.get("plan_qa") is None:
+                        st.session_state.plan_qa = PlanQA(
+                            gemini_model, st.session_state.dietary_plan, st.session_state.fitness_plan
+                        )
+
+                    try:
+                        answer_slot = st.empty()
+                        answer = ""
+                        for delta in st.session_state.plan_qa.ask(question_input, response_cache):
+                            answer += delta
+                            answer_slot.markdown(answer + "▌")
+                        answer_slot.empty()
+
+                        if not answer:
+                            answer = "Sorry, I couldn't generate a response at this time."
+
+                        st.session_state.qa_pairs.append((question_input, answer))
+                    except Exception as e:
+                        st.error(f"❌ An error occurred while getting the answer: {e}")
+
+            if st.session_state.qa_pairs:
+                st.markdown("### 💬 Previous Questions & Answers")
+                for idx, (question, answer) in enumerate(st.session_state.qa_pairs):
+                    with st.container():
+                        st.markdown(f"""
+                        <div style='background-color: #f8fafc; padding: 1rem; border-radius: 10px; margin: 0.5rem 0;'>
+                            <p style='color: #4a5568; margin-bottom: 0.5rem;'><strong>Q: {question}</strong></p>
+                            <p style='color: #2d3748;'>A: {answer}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
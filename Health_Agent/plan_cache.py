@@ -0,0 +1,219 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+# Shared helpers live in common/ at the repository root
+ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from phi.model.google import Gemini
+
+from common.response_cache import get_response_cache
+from planner import MODEL_ID, PLANS, build_user_profile, generate_plan
+
+logger = logging.getLogger(__name__)
+
+STORE_PATH = Path(os.getenv("PLAN_STORE_PATH", Path.home() / ".cache" / "ai-agents" / "plans.sqlite3"))
+
+
+def _bucket_size(variable, default=5):
+    size = int(os.getenv(variable, default))
+    if size < 1:
+        raise ValueError(f"{variable} must be at least 1, got {size}")
+    return size
+
+
+# Width of the age (years), height (cm) and weight (kg) ranges that share a plan
+BUCKET_SIZES = {
+    "age": _bucket_size("PLAN_AGE_BUCKET"),
+    "height": _bucket_size("PLAN_HEIGHT_BUCKET"),
+    "weight": _bucket_size("PLAN_WEIGHT_BUCKET"),
+}
+PRECOMPUTE_TOP = 100
+# Gemini calls made at once by the precompute command, each profile makes two
+MAX_PRECOMPUTE_WORKERS = 4
+
+PROFILE_FIELDS = ("age", "weight", "height", "sex", "activity_level", "dietary_preferences", "fitness_goals")
+
+
+def bucket_profile(profile, bucket_sizes=None):
+    """Profile with age, height and weight replaced by the range they fall in, e.g. "25-29"."""
+    bucket_sizes = bucket_sizes or BUCKET_SIZES
+    bucketed = {field: profile[field] for field in PROFILE_FIELDS}
+    for field, size in bucket_sizes.items():
+        if size < 1:
+            raise ValueError(f"{field} bucket size must be at least 1, got {size}")
+        start = int(float(profile[field]) // size * size)
+        bucketed[field] = f"{start}-{start + size - 1}" if size > 1 else str(start)
+    return bucketed
+
+
+def profile_key(bucketed, model_id=MODEL_ID):
+    return json.dumps({"model": model_id, "profile": bucketed}, sort_keys=True)
+
+
+def bucketed_user_profile(bucketed):
+    """The prompt a plan for every profile in the bucket is generated from."""
+    return build_user_profile(*(bucketed[field] for field in PROFILE_FIELDS))
+
+
+class PlanStore:
+    """SQLite store of dietary and fitness plans keyed on a bucketed profile.
+
+    Every lookup is counted per bucket, whether it hit or not, so the precompute
+    command can generate plans for the profiles people actually ask for.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "key TEXT PRIMARY KEY, dietary TEXT NOT NULL, fitness TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lookups ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, last_seen REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """The stored {"dietary": ..., "fitness": ...} plans for key, or None."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO lookups (key, count, last_seen) VALUES (?, 1, ?) "
+                "ON CONFLICT (key) DO UPDATE SET count = count + 1, last_seen = excluded.last_seen",
+                (key, time.time()),
+            )
+            row = conn.execute("SELECT dietary, fitness FROM plans WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if row is None else {"dietary": json.loads(row[0]), "fitness": json.loads(row[1])}
+
+    def put(self, key, plans):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO plans (key, dietary, fitness, created) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(plans["dietary"]), json.dumps(plans["fitness"]), time.time()),
+            )
+
+    def contains(self, key):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM plans WHERE key = ?", (key,)).fetchone() is not None
+
+    def most_requested(self, limit):
+        """Keys of the most looked up buckets that have no plan yet, most frequent first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT lookups.key FROM lookups LEFT JOIN plans ON plans.key = lookups.key "
+                "WHERE plans.key IS NULL ORDER BY lookups.count DESC, lookups.last_seen DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_plan_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PlanStore()
+        return _default_store
+
+
+def generate_bucket_plans(model, key, cache=None):
+    """Generate both plans for the bucket behind key, for storing under it."""
+    bucketed = json.loads(key)["profile"]
+    user_profile = bucketed_user_profile(bucketed)
+    return {kind: generate_plan(kind, model, user_profile, cache) for kind in PLANS}
+
+
+def read_profiles(path, bucket_sizes=None, model_id=MODEL_ID):
+    """Bucket keys of a JSON lines file of profiles, counted, e.g. exported from sign-up data."""
+    keys = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                keys[profile_key(bucket_profile(json.loads(line), bucket_sizes), model_id)] += 1
+    return keys
+
+
+def precompute(model, keys, store=None, cache=None, max_workers=MAX_PRECOMPUTE_WORKERS):
+    """Generate and store plans for every key that has none yet, max_workers at a time."""
+    store = store or get_plan_store()
+    keys = [key for key in dict.fromkeys(keys) if not store.contains(key)]
+    started = time.monotonic()
+    done = failed = 0
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="precompute") as pool:
+        futures = {pool.submit(generate_bucket_plans, model, key, cache): key for key in keys}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                store.put(key, future.result())
+                done += 1
+            except Exception as e:
+                logger.warning("Plans for %s failed: %s", json.loads(key)["profile"], e)
+                failed += 1
+    logger.info("Stored plans for %d profiles (%d failed) in %.1fs", done, failed, time.monotonic() - started)
+    return done, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate dietary and fitness plans in advance for the most common profile buckets."
+    )
+    parser.add_argument("--top", type=int, default=PRECOMPUTE_TOP,
+                        help=f"Number of bucket combinations to generate (default: {PRECOMPUTE_TOP})")
+    parser.add_argument("--profiles",
+                        help="JSON lines file of profiles to take the most common buckets from, "
+                             "instead of the lookups recorded by the app")
+    parser.add_argument("--max-workers", type=int, default=MAX_PRECOMPUTE_WORKERS,
+                        help=f"Profiles generated at once (default: {MAX_PRECOMPUTE_WORKERS})")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the local response cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    store = get_plan_store()
+    if args.profiles:
+        keys = [key for key, _ in read_profiles(args.profiles).most_common() if not store.contains(key)][:args.top]
+    else:
+        keys = store.most_requested(args.top)
+    if not keys:
+        logger.info("Every requested profile bucket already has plans")
+        return
+    # Reads GOOGLE_API_KEY from the environment
+    model = Gemini(id=MODEL_ID)
+    precompute(model, keys, store, None if args.no_cache else get_response_cache(), args.max_workers)
+
+
+if __name__ == "__main__":
+    main()
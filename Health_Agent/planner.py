@@ -0,0 +1,141 @@
+import contextvars
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from phi.agent import Agent
+
+from common.response_cache import cached_run, cached_stream
+from common.tracing import get_tracer
+
+# Seconds each plan agent gets before its plan is reported as failed
+PLAN_TIMEOUT = 90.0
+MODEL_ID = "gemini-1.5-flash"
+
+# Choices offered for the categorical parts of the profile
+SEXES = ("Male", "Female", "Other")
+ACTIVITY_LEVELS = ("Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active")
+DIETARY_PREFERENCES = ("Vegetarian", "Keto", "Gluten Free", "Low Carb", "Dairy Free")
+FITNESS_GOALS = ("Lose Weight", "Gain Muscle", "Endurance", "Stay Fit", "Strength Training")
+
+
+def build_dietary_agent(model):
+    return Agent(
+        name="Dietary Expert",
+        role="Provides personalized dietary recommendations",
+        model=model,
+        instructions=[
+            "Consider the user's input, including dietary restrictions and preferences.",
+            "Suggest a detailed meal plan for the day, including breakfast, lunch, dinner, and snacks.",
+            "Provide a brief explanation of why the plan is suited to the user's goals.",
+            "Focus on clarity, coherence, and quality of the recommendations.",
+        ]
+    )
+
+
+def build_fitness_agent(model):
+    return Agent(
+        name="Fitness Expert",
+        role="Provides personalized fitness recommendations",
+        model=model,
+        instructions=[
+            "Provide exercises tailored to the user's goals.",
+            "Include warm-up, main workout, and cool-down exercises.",
+            "Explain the benefits of each recommended exercise.",
+            "Ensure the plan is actionable and detailed.",
+        ]
+    )
+
+
+def build_user_profile(age, weight, height, sex, activity_level, dietary_preferences, fitness_goals):
+    return f"""
+    Age: {age}
+    Weight: {weight}kg
+    Height: {height}cm
+    Sex: {sex}
+    Activity Level: {activity_level}
+    Dietary Preferences: {dietary_preferences}
+    Fitness Goals: {fitness_goals}
+    """
+
+
+def make_dietary_plan(content):
+    return {
+        "why_this_plan_works": "High Protein, Healthy Fats, Moderate Carbohydrates, and Caloric Balance",
+        "meal_plan": content,
+        "important_considerations": """
+        - Hydration: Drink plenty of water throughout the day
+        - Electrolytes: Monitor sodium, potassium, and magnesium levels
+        - Fiber: Ensure adequate intake through vegetables and fruits
+        - Listen to your body: Adjust portion sizes as needed
+        """
+    }
+
+
+def make_fitness_plan(content):
+    return {
+        "goals": "Build strength, improve endurance, and maintain overall fitness",
+        "routine": content,
+        "tips": """
+        - Track your progress regularly
+        - Allow proper rest between workouts
+        - Focus on proper form
+        - Stay consistent with your routine
+        """
+    }
+
+
+PLANS = {
+    "dietary": (build_dietary_agent, make_dietary_plan),
+    "fitness": (build_fitness_agent, make_fitness_plan),
+}
+
+
+def generate_plan(kind, model, user_profile, cache=None):
+    build_agent, make_plan = PLANS[kind]
+    # An agent configures the model it runs on, so agents that may run at the same time each get a copy
+    return make_plan(cached_run(build_agent(model.model_copy()), user_profile, cache).content)
+
+
+def generate_plans(model, user_profile, cache=None, timeout=PLAN_TIMEOUT):
+    """Run the dietary and fitness agents concurrently, streaming their output.
+
+    Yields (kind, event, value) tuples in arrival order: "delta" with the next chunk
+    of plan text, then either "done" with the finished plan or "error" with the
+    exception when the agent failed or ran past timeout. A failing agent does not
+    affect the other plan.
+    """
+    events = queue.Queue()
+
+    def worker(kind, queued_at):
+        build_agent, make_plan = PLANS[kind]
+        try:
+            with get_tracer().span(f"{kind}_plan", kind="task", queued_at=queued_at):
+                parts = []
+                for delta in cached_stream(build_agent(model.model_copy()), user_profile, cache):
+                    parts.append(delta)
+                    events.put((kind, "delta", delta))
+            events.put((kind, "done", make_plan("".join(parts))))
+        except Exception as e:
+            events.put((kind, "error", e))
+
+    pool = ThreadPoolExecutor(max_workers=len(PLANS), thread_name_prefix="plan")
+    for kind in PLANS:
+        # Each worker runs in a copy of the caller's context so its span joins the caller's trace
+        pool.submit(contextvars.copy_context().run, worker, kind, time.monotonic())
+
+    deadline = time.monotonic() + timeout
+    pending = set(PLANS)
+    try:
+        while pending:
+            try:
+                kind, event, value = events.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                for kind in pending:
+                    yield kind, "error", TimeoutError(f"no response after {timeout:.0f} seconds")
+                return
+            if event != "delta":
+                pending.discard(kind)
+            yield kind, event, value
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
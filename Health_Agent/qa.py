@@ -0,0 +1,180 @@
+import math
+import re
+from collections import Counter
+
+from phi.agent import Agent
+
+from common.response_cache import cached_run, cached_stream
+
+# Plan sections sent with every question
+TOP_SECTIONS = 3
+# Words per plan section, paragraphs are merged up to this size
+SECTION_WORDS = 120
+# Earlier answers kept word for word, older ones are folded into the conversation summary
+RECENT_PAIRS = 2
+SUMMARY_LINES = 12
+SUMMARY_ANSWER_WORDS = 30
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+HEADING_PATTERN = re.compile(r"^\s*(#{1,6}\s+.+|\*\*[^*]+\*\*:?)\s*$")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or should that the this to "
+    "what when which why with you your".split()
+)
+
+
+def tokenize(text):
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+
+def split_sections(title, text, max_words=SECTION_WORDS):
+    """Split plan text into sections of at most max_words, each labelled with its nearest heading."""
+    sections = []
+    heading, words = title, []
+
+    def flush():
+        if words:
+            sections.append({"title": heading, "text": " ".join(words)})
+            words.clear()
+
+    for block in re.split(r"\n\s*\n", text or ""):
+        for line in block.splitlines():
+            if HEADING_PATTERN.match(line):
+                flush()
+                heading = f"{title} - {line.strip(' #*:')}"
+            elif line.strip():
+                line_words = line.split()
+                if words and len(words) + len(line_words) > max_words:
+                    flush()
+                words.extend(line_words)
+        if len(words) >= max_words // 2:
+            flush()
+    flush()
+    return sections
+
+
+class BM25Index:
+    def __init__(self, documents, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.terms = [Counter(tokenize(document)) for document in documents]
+        self.lengths = [sum(terms.values()) for terms in self.terms]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        frequency = Counter(term for terms in self.terms for term in terms)
+        count = len(documents)
+        self.idf = {term: math.log(1 + (count - df + 0.5) / (df + 0.5)) for term, df in frequency.items()}
+
+    def scores(self, query):
+        query_terms = set(tokenize(query))
+        scores = []
+        for terms, length in zip(self.terms, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            scores.append(sum(
+                self.idf[term] * terms[term] * (self.k1 + 1) / (terms[term] + norm)
+                for term in query_terms if term in terms
+            ))
+        return scores
+
+    def top(self, query, k):
+        """Indexes of the k best matching documents with a non-zero score, best first."""
+        scores = self.scores(query)
+        ranked = sorted(range(len(scores)), key=lambda index: scores[index], reverse=True)
+        return [index for index in ranked[:k] if scores[index] > 0]
+
+
+def build_qa_agent(model):
+    return Agent(
+        name="Plan Assistant",
+        role="Answers questions about the user's dietary and fitness plans",
+        model=model,
+        instructions=[
+            "Answer the user's question using the plan overview and plan sections provided.",
+            "Take the earlier conversation into account when the question refers to it.",
+            "If the plans don't cover the question, say so and give general guidance.",
+        ],
+        markdown=True,
+    )
+
+
+def build_plan_summarizer(model):
+    return Agent(
+        name="Plan Summarizer",
+        model=model,
+        instructions=[
+            "Condense the dietary and fitness plans into a compact structured summary under the headings Diet and Fitness.",
+            "Keep the key facts: meals and portions, calories or macros if given, workout days, exercises, sets and reps.",
+            "Use short bullet points and at most 150 words.",
+        ],
+        markdown=True,
+    )
+
+
+class PlanQA:
+    """Question answering over one session's plans with a small, flat prompt.
+
+    The plans are condensed into an overview once, and every question is sent with
+    that overview, the plan sections that match it best (BM25 over the plan text)
+    and a bounded summary of the conversation so far, instead of the full plans.
+    """
+
+    def __init__(self, model, dietary_plan, fitness_plan, top_sections=TOP_SECTIONS):
+        self.model = model
+        self.plans_text = (
+            f"Dietary Plan: {dietary_plan.get('meal_plan', '')}\n\nFitness Plan: {fitness_plan.get('routine', '')}"
+        )
+        self.sections = (
+            split_sections("Dietary plan", dietary_plan.get("meal_plan", ""))
+            + split_sections("Fitness plan", fitness_plan.get("routine", ""))
+        )
+        self.index = BM25Index([f"{section['title']} {section['text']}" for section in self.sections])
+        self.top_sections = top_sections
+        # Sessions share the model, every agent runs on its own copy
+        self.agent = build_qa_agent(model.model_copy())
+        self.overview = None
+        self.recent = []
+        self.summary = []
+
+    def get_overview(self, cache=None):
+        if self.overview is None:
+            self.overview = cached_run(build_plan_summarizer(self.model.model_copy()), self.plans_text, cache).content or ""
+        return self.overview
+
+    def relevant_sections(self, question):
+        # Earlier questions help with follow-ups like "and for dinner?"
+        query = " ".join([question] + [asked for asked, _ in self.recent[-1:]])
+        return [self.sections[index] for index in self.index.top(query, self.top_sections)]
+
+    def build_prompt(self, question, cache=None):
+        parts = [f"Plan overview:\n{self.get_overview(cache)}"]
+        sections = self.relevant_sections(question)
+        if sections:
+            parts.append("Relevant plan sections:\n" + "\n\n".join(
+                f"[{section['title']}]\n{section['text']}" for section in sections
+            ))
+        if self.summary:
+            parts.append("Earlier conversation:\n" + "\n".join(self.summary))
+        if self.recent:
+            parts.append("Recent questions and answers:\n" + "\n\n".join(
+                f"Q: {asked}\nA: {answer}" for asked, answer in self.recent
+            ))
+        parts.append(f"User Question: {question}")
+        return "\n\n".join(parts)
+
+    def remember(self, question, answer):
+        self.recent.append((question, answer))
+        while len(self.recent) > RECENT_PAIRS:
+            asked, old_answer = self.recent.pop(0)
+            words = old_answer.split()
+            short = " ".join(words[:SUMMARY_ANSWER_WORDS]) + (" ..." if len(words) > SUMMARY_ANSWER_WORDS else "")
+            self.summary = (self.summary + [f"- Q: {asked} A: {short}"])[-SUMMARY_LINES:]
+
+    def ask(self, question, cache=None):
+        """Stream the answer to question, adding the exchange to the conversation once it is complete."""
+        prompt = self.build_prompt(question, cache)
+        parts = []
+        for delta in cached_stream(self.agent, prompt, cache):
+            parts.append(delta)
+            yield delta
+        self.remember(question, "".join(parts))
@@ -1,110 +1,123 @@
-import streamlit as st
-from phi.agent import Agent
-from phi.tools.duckduckgo import DuckDuckGo
-from phi.model.groq import Groq
-from phi.tools.newspaper4k import Newspaper4k
-import logging
-
-logging.basicConfig(level=logging.DEBUG)
-
-# Setting up Streamlit app
-st.title("AI Startup Trend Analysis Agent 📈")
-st.caption("Get the latest trend analysis and startup opportunities based on your topic of interest in a click!.")
-
-topic = st.text_input("Enter the area of interest for your Startup:")
-groq_api_key = "your_groq_api_key"
-
-if st.button("Generate Analysis"):
-    if not groq_api_key:
-        st.warning("Please enter the required API key.")
-    else:
-        with st.spinner("Processing your request..."):
-            try:
-                # Initialize groq model
-                groq_model = Groq(id="llama-3.3-70b-versatile", api_key=groq_api_key)
-
-                # Define News Collector Agent - DuckDuckGo search tool for collecting articles
-                search_tool = DuckDuckGo(search=True, news=True, fixed_max_results=5)
-
-                news_collector = Agent(
-                    name="News Collector",
-                    role="Searches the web for the most recent articles related to the user's specified startup topic. It gathers news from credible sources and filters out irrelevant or outdated information. It will return detailed article titles, links, and short descriptions to ensure that only relevant articles are passed for summarization.",
-                    tools=[search_tool],
-                    model=groq_model,
-                    instructions=[
-                        "Search DuckDuckGo for the most recent news articles related to the specified topic.",
-                        "Filter the articles based on relevance and publication date, ensuring the articles reflect current trends and information.",
-                        "Collect at least 5 articles, ensuring that each article provides meaningful insights into the topic.",
-                        "Return detailed information about each article, including the title, source, and a brief description of the content."
-                    ],
-                    show_tool_calls=True,
-                    markdown=True,
-                )
-
-                # Define Summary Writer Agent - Newspaper4k tool for summarizing articles
-                news_tool = Newspaper4k(read_article=True, include_summary=True)
-
-                summary_writer = Agent(
-                    name="Summary Writer",
-                    role="Reads and extracts key insights from the collected news articles. Summarizes each article in a concise, yet informative way, ensuring all important points are highlighted. It should focus on extracting actionable data related to trends, startup opportunities, and relevant statistics.",
-                    tools=[news_tool],
-                    model=groq_model,
-                    instructions=[
-                        "Read the articles collected by the News Collector agent thoroughly.",
-                        "Summarize each article clearly and concisely, focusing on the key points, data, and trends. Extract relevant insights on emerging startup opportunities, new business ideas, market trends, or any disruptive innovations mentioned in the articles.",
-                        "Ensure that the summary provides actionable insights that could be used by an entrepreneur to understand the latest market dynamics in the specified area.",
-                        "Provide a well-structured summary for each article, including key takeaways, insights into market behavior, and potential startup ideas."
-                    ],
-                    show_tool_calls=True,
-                    markdown=True,
-                )
-
-                # Define Trend Analyzer Agent - Analyzes trends from the summaries
-                trend_analyzer = Agent(
-                    name="Trend Analyzer",
-                    role="Analyzes the summaries from the Summary Writer Agent to identify emerging trends and startup opportunities. It should assess the collected data, identify patterns, and make recommendations for entrepreneurs about market gaps and growth opportunities. It will provide a detailed, structured analysis of trends.",
-                    model=groq_model,
-                    instructions=[
-                        "Analyze the summaries provided by the Summary Writer agent to extract key emerging trends and startup opportunities.",
-                        "Focus on identifying patterns in the market, such as new technologies, market disruptions, consumer behavior changes, and new business models.",
-                        "Assess the viability of each identified trend as a potential startup opportunity. Consider market demand, scalability, competition, and innovation.",
-                        "Provide a detailed report that outlines each identified trend, its potential impact, and the types of startups that could thrive in these emerging areas.",
-                        "Structure the report clearly and offer actionable insights that an entrepreneur can follow to tap into these opportunities."
-                    ],
-                    show_tool_calls=True,
-                    markdown=True,
-                )
-
-                # The multi-agent Team setup for trend analysis
-                agent_team = Agent(
-                    agents=[news_collector, summary_writer, trend_analyzer],
-                    instructions=[
-                        "Start by searching for recent news articles on the topic provided by the user using DuckDuckGo.",
-                        "After gathering the articles, pass them to the Summary Writer agent. Ensure that each article is summarized in a way that highlights the trends and startup opportunities.",
-                        "The Summary Writer will condense the information and pass the summaries to the Trend Analyzer agent for analysis.",
-                        "The Trend Analyzer will thoroughly review the summaries, identify key trends, and present actionable startup opportunities in a detailed report format.",
-                        "Ensure that the entire process from collecting articles to generating the trend report flows seamlessly. The output should be informative, structured, and helpful for entrepreneurs looking to enter the market."
-                    ],
-                    show_tool_calls=True,
-                    markdown=True,
-                )
-
-                # Executing the multi-agent workflow
-                # Step 1: Collect news
-                news_response = news_collector.run(f"Collect recent news on {topic}")
-                articles = news_response.content
-
-                # Step 2: Summarize articles
-                summary_response = summary_writer.run(f"Summarize the following articles:\n{articles}")
-                summaries = summary_response.content
-
-                # Step 3: Analyze trends
-                trend_response = trend_analyzer.run(f"Analyze trends from the following summaries:\n{summaries}")
-                analysis = trend_response.content
-
-
-                st.subheader("Trend Analysis and Potential Startup Opportunities")
-                st.write(analysis)
-
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+import streamlit as st
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Shared helpers live in common/ at the repository root
+ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from article_cache import get_article_cache
+from common.response_cache import get_response_cache
+from common.routing import ModelRouter
+from common.tracing import get_tracer
+from compression import ARTICLE_TOKEN_BUDGET
+from jobs import get_job_manager
+from pipeline import ARTICLE_TIMEOUT, MAX_CONCURRENT_ARTICLES
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+# Spans for every agent run, tool call and article task go to ~/.cache/ai-agents/traces
+get_tracer("journalist")
+
+# Seconds between reruns while a background analysis is in progress
+POLL_INTERVAL = 1.0
+STAGE_LABELS = {
+    "queued": "(waiting for a free worker)",
+    None: "(collecting news)",
+    "articles": "(reading the articles)",
+    "compression": "(summarizing the articles)",
+    "summary": "(summarizing the articles)",
+    "summaries": "(analyzing trends)",
+    "analysis_delta": "(writing the report)",
+}
+
+# Setting up Streamlit app
+st.title("AI Startup Trend Analysis Agent 📈")
+st.caption("Get the latest trend analysis and startup opportunities based on your topic of interest in a click!.")
+
+with st.sidebar:
+    st.subheader("Settings")
+    max_concurrency = st.number_input(
+        "Articles processed in parallel", min_value=1, max_value=10, value=MAX_CONCURRENT_ARTICLES
+    )
+    article_timeout = st.number_input(
+        "Timeout per article (seconds)", min_value=5, max_value=300, value=int(ARTICLE_TIMEOUT),
+        help="Articles that take longer to download or summarize are left out of the report."
+    )
+    use_response_cache = st.checkbox(
+        "Reuse cached responses", value=True,
+        help="Serve repeated agent requests from the local response cache instead of calling Groq again. "
+             "Answers based on news searches are only reused for 15 minutes, the searches for at most 20."
+    )
+    compress_articles = st.checkbox(
+        "Compress articles before summarizing", value=False,
+        help="Strip boilerplate and repeated sentences and keep only the most central sentences of each article."
+    )
+    token_budget = st.number_input(
+        "Tokens per article", min_value=100, max_value=4000, value=ARTICLE_TOKEN_BUDGET, step=100,
+        disabled=not compress_articles
+    )
+    cache_stats = get_article_cache().stats()
+    st.caption(
+        f"Article cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+
+topic = st.text_input("Enter the area of interest for your Startup:")
+groq_api_key = "your_groq_api_key"
+
+if st.button("Generate Analysis"):
+    if not groq_api_key:
+        st.warning("Please enter the required API key.")
+    else:
+        try:
+            # Initialize groq models, every agent gets the model routed to it (see common/routing.py).
+            # Calls are rate limited and retried process-wide.
+            groq_models = ModelRouter(api_key=groq_api_key)
+
+            # Executing the multi-agent workflow in the background: news collection, one
+            # summary per article in parallel, then the trend analysis over the merged
+            # summaries. Sessions asking for the same topic share one run.
+            st.session_state.job_id = get_job_manager().submit(
+                topic, groq_models, max_concurrency=int(max_concurrency), article_timeout=float(article_timeout),
+                cache=get_response_cache() if use_response_cache else None,
+                token_budget=int(token_budget) if compress_articles else None
+            )
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
+
+# Reruns of the script poll the job and show every stage as soon as it finishes
+job = get_job_manager().get(st.session_state.job_id) if "job_id" in st.session_state else None
+if job is not None:
+    state = job.snapshot()
+    articles_box = st.expander("📰 Collected articles")
+    summaries_box = st.expander("📝 Article summaries", expanded=True)
+    if state["articles"]:
+        articles_box.markdown(state["articles"])
+    if state["compression"]:
+        compression = state["compression"]
+        saved = compression["tokens_saved"] / compression["tokens_before"] if compression["tokens_before"] else 0.0
+        summaries_box.caption(
+            f"Compression kept {compression['tokens_after']:,} of {compression['tokens_before']:,} article tokens "
+            f"({saved:.0%} saved)"
+        )
+    for article, summary in state["summaries"]:
+        summaries_box.markdown(f"### {article['title']}\nSource: {article['url']}\n\n{summary}")
+
+    st.subheader("Trend Analysis and Potential Startup Opportunities")
+    if state["status"] == "failed":
+        st.error(f"An error occurred: {state['error']}")
+    elif state["status"] == "done":
+        st.markdown(state["analysis"])
+    else:
+        if state["analysis"]:
+            st.markdown(state["analysis"] + "▌")
+        if state["subscribers"] > 1:
+            st.caption(f"This analysis is shared with {state['subscribers'] - 1} other request(s) for the same topic.")
+        stage = "queued" if state["status"] == "queued" else state["stage"]
+        with st.spinner(f"Processing your request... {STAGE_LABELS.get(stage, '')}"):
+            time.sleep(POLL_INTERVAL)
+        st.rerun()
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from phi.tools.newspaper4k import Newspaper4k
+
+from common.tracing import mark_cache_hit
+
+CACHE_DIR = Path(os.getenv("ARTICLE_CACHE_DIR", Path.home() / ".cache" / "ai-agents" / "articles"))
+CACHE_TTL = 24 * 3600
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid", "ocid", "taid", "guccounter"}
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+class ArticleCache:
+    """On-disk cache of extracted articles keyed by normalized URL.
+
+    Every entry is one JSON file written with an atomic rename, so Streamlit sessions
+    and separate processes can share a directory. Reads bump the file's mtime and
+    eviction removes the least recently used files once max_bytes is exceeded.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._estimated_bytes = None
+
+    def _path(self, url):
+        return self.directory / f"{hashlib.sha256(normalize_url(url).encode()).hexdigest()}.json"
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, url):
+        path = self._path(url)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._record(hit=False)
+            return None
+
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            self._record(hit=False)
+            return None
+
+        with suppress(OSError):
+            os.utime(path)
+        self._record(hit=True)
+        return entry["article"]
+
+    def put(self, url, article):
+        entry = {
+            "url": normalize_url(url),
+            "fetched_at": time.time(),
+            "article": {key: article.get(key) for key in ("title", "text", "publish_date")},
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(url))
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            if self._estimated_bytes is not None:
+                self._estimated_bytes += os.path.getsize(self._path(url))
+            # Only rescan the directory when the running estimate says we may be over
+            if self._estimated_bytes is None or self._estimated_bytes > self.max_bytes:
+                self._estimated_bytes = self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            with suppress(OSError):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            with suppress(OSError):
+                path.unlink()
+            total -= size
+        return total
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_article_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ArticleCache()
+        return _default_cache
+
+
+class CachedNewspaper4k(Newspaper4k):
+    """Newspaper4k tool that reads extracted articles from an ArticleCache first."""
+
+    def __init__(self, cache=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache or get_article_cache()
+
+    def get_article_data(self, url):
+        article = self.cache.get(url)
+        mark_cache_hit(article is not None)
+        if article is None:
+            article = super().get_article_data(url)
+            if article and article.get("text"):
+                self.cache.put(url, article)
+        return article
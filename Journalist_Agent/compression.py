@@ -0,0 +1,164 @@
+import math
+import re
+
+import numpy as np
+
+# Default size each article is cut down to before it reaches the summary writer
+ARTICLE_TOKEN_BUDGET = 600
+# Cosine similarity of TF-IDF vectors above which two sentences count as the same,
+# e.g. syndicated wire copy or a quote repeated by several outlets
+DUPLICATE_SIMILARITY = 0.85
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 50
+
+SENTENCE_SPLIT = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"'”’)\]]))\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+# Titles, initials, acronyms, company suffixes and the like whose period does not end the sentence,
+# e.g. "Dr. Smith", "J. Doe", "U.S. stocks" or "Apple Inc. shares"
+ABBREVIATION = re.compile(
+    r"(?:\b(?:Mr|Mrs|Ms|Dr|Prof|Sr|Jr|St|Gen|Sen|Rep|Gov|Lt|Col|Capt|vs|No|Fig|Jan|Feb|Aug|Sept|Oct|Nov|Dec)"
+    r"|\b(?:Inc|Corp|Co|Ltd|Bros)|(?:^|[\s(])(?:[A-Z]\.)*[A-Z]|\b(?:e\.g|i\.e))\.$"
+)
+# Sentences end with punctuation, navigation links, bylines and captions usually don't
+SENTENCE_END = re.compile(r"[.!?][\"'”’)\]]*$")
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+BOILERPLATE_PATTERN = re.compile(
+    r"\b(subscribe|newsletter|sign up|sign in|log in|all rights reserved|copyright|advertisement|"
+    r"cookies?|privacy policy|terms of (use|service)|click here|read more|follow us|share this|"
+    r"related articles?|recommended for you|download (our|the) app)\b",
+    re.IGNORECASE,
+)
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have he her his i if in into is it its of on or our "
+    "she so than that the their them there these they this to was we were what when which who will with "
+    "would you your said says also more about after over than up out new one two".split()
+)
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text
+    return math.ceil(len(text) / 4)
+
+
+def split_sentences(text):
+    sentences = []
+    for paragraph in re.split(r"\n\s*\n|\n", text or ""):
+        merged = []
+        for sentence in SENTENCE_SPLIT.split(paragraph.strip()):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if merged and ABBREVIATION.search(merged[-1]):
+                # The split came right after an abbreviation, put the sentence back together
+                merged[-1] += " " + sentence
+            else:
+                merged.append(sentence)
+        sentences += merged
+    return sentences
+
+
+def is_boilerplate(sentence):
+    words = sentence.split()
+    # Sign-up prompts and legal lines match a pattern, navigation, bylines and captions are
+    # short fragments without an end of sentence. Short sentences like "Shares fell 12%." stay.
+    if len(words) < 4 and SENTENCE_END.search(sentence) is None:
+        return True
+    return len(words) < 30 and BOILERPLATE_PATTERN.search(sentence) is not None
+
+
+def tfidf_matrix(sentences):
+    """L2-normalized TF-IDF rows, one per sentence, with sublinear term frequency."""
+    vocabulary = {}
+    rows, columns, counts = [], [], []
+    for row, sentence in enumerate(sentences):
+        terms = {}
+        for word in WORD_PATTERN.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                column = vocabulary.setdefault(word, len(vocabulary))
+                terms[column] = terms.get(column, 0) + 1
+        rows += [row] * len(terms)
+        columns += terms.keys()
+        counts += terms.values()
+
+    matrix = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float32)
+    matrix[rows, columns] = 1.0 + np.log(np.asarray(counts, dtype=np.float32))
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1.0 + len(sentences)) / (1.0 + document_frequency)) + 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def textrank(similarity):
+    """PageRank scores over a sentence similarity graph."""
+    count = similarity.shape[0]
+    if count == 0:
+        return np.zeros(0)
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0.0)
+    totals = weights.sum(axis=1, keepdims=True)
+    # Sentences sharing no terms with the rest spread their score evenly
+    transition = np.where(totals > 0, weights / np.where(totals == 0, 1.0, totals), 1.0 / count)
+    scores = np.full(count, 1.0 / count)
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = (1 - TEXTRANK_DAMPING) / count + TEXTRANK_DAMPING * transition.T @ scores
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+def select_sentences(sentences, scores, token_budget):
+    """Highest scoring sentences that fit token_budget, in their original order."""
+    chosen, used = [], 0
+    for index in np.argsort(-scores, kind="stable"):
+        tokens = estimate_tokens(sentences[index]) + 1
+        if used + tokens <= token_budget:
+            chosen.append(index)
+            used += tokens
+    return [sentences[index] for index in sorted(chosen)]
+
+
+def compress_articles(articles, token_budget=ARTICLE_TOKEN_BUDGET, duplicate_similarity=DUPLICATE_SIMILARITY):
+    """Cut every article down to its most central sentences before it is summarized.
+
+    Boilerplate is stripped, sentences that repeat one kept earlier in the same or
+    another article are dropped and the rest are ranked with TextRank over TF-IDF
+    similarities, keeping each article under token_budget. Articles with nothing
+    left are dropped. Returns the compressed articles and a stats dict with the
+    token counts before and after.
+    """
+    sentences, owners = [], []
+    stats = {
+        "articles": len(articles), "tokens_before": 0, "tokens_after": 0,
+        "boilerplate": 0, "duplicates": 0, "dropped": 0,
+    }
+    for number, article in enumerate(articles):
+        stats["tokens_before"] += estimate_tokens(article["text"])
+        for sentence in split_sentences(article["text"]):
+            if is_boilerplate(sentence):
+                stats["boilerplate"] += 1
+            else:
+                sentences.append(sentence)
+                owners.append(number)
+
+    owners = np.asarray(owners, dtype=np.int64)
+    matrix = tfidf_matrix(sentences)
+    similarity = matrix @ matrix.T
+    # A sentence is a duplicate when any earlier sentence is nearly identical to it
+    duplicate = (np.tril(similarity, k=-1) >= duplicate_similarity).any(axis=1)
+    stats["duplicates"] = int(duplicate.sum())
+
+    compressed = []
+    for number, article in enumerate(articles):
+        indexes = np.flatnonzero((owners == number) & ~duplicate)
+        kept = [sentences[index] for index in indexes]
+        if estimate_tokens(" ".join(kept)) > token_budget:
+            kept = select_sentences(kept, textrank(similarity[np.ix_(indexes, indexes)]), token_budget)
+        if not kept:
+            stats["dropped"] += 1
+            continue
+        text = " ".join(kept)
+        stats["tokens_after"] += estimate_tokens(text)
+        compressed.append({**article, "text": text})
+
+    stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+    return compressed, stats
@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import ARTICLE_TIMEOUT, MAX_CONCURRENT_ARTICLES, iter_analysis
+
+logger = logging.getLogger(__name__)
+
+# Analyses running at once, later jobs wait in the pool's queue
+MAX_RUNNING_JOBS = 2
+# Seconds a finished analysis is kept and handed to anyone asking for the same topic
+RESULT_RETENTION = 10 * 60
+
+
+def normalize_topic(topic):
+    return " ".join(topic.casefold().split())
+
+
+class AnalysisJob:
+    """Progress and result of one analysis, updated stage by stage from a worker thread."""
+
+    def __init__(self, topic, key):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.key = key
+        self.status = "queued"
+        self.stage = None
+        self.articles = None
+        self.compression = None
+        self.summaries = []
+        self.analysis = ""
+        self.error = None
+        self.subscribers = 1
+        self.created = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    def start(self):
+        with self._lock:
+            self.status = "running"
+
+    def apply(self, stage, value):
+        with self._lock:
+            self.stage = stage
+            if stage == "articles":
+                self.articles = value
+            elif stage == "compression":
+                self.compression = value
+            elif stage == "summary":
+                self.summaries.append(value)
+            elif stage == "analysis_delta":
+                self.analysis += value
+            elif stage == "analysis":
+                self.analysis = value
+
+    def finish(self, error=None):
+        with self._lock:
+            self.status = "failed" if error else "done"
+            self.error = error
+            self.finished_at = time.time()
+
+    def subscribe(self):
+        with self._lock:
+            self.subscribers += 1
+
+    def snapshot(self):
+        """Consistent copy of the job's progress for rendering."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "topic": self.topic,
+                "status": self.status,
+                "stage": self.stage,
+                "articles": self.articles,
+                "compression": self.compression,
+                "summaries": list(self.summaries),
+                "analysis": self.analysis,
+                "error": self.error,
+                "subscribers": self.subscribers,
+            }
+
+
+class JobManager:
+    """Runs analyses in the background on a bounded worker pool.
+
+    Submitting a topic that is already queued, running or finished within the
+    retention window returns the existing job instead of starting another one,
+    so every session asking for it shares one run. Failed jobs are not reused.
+    """
+
+    def __init__(self, max_workers=MAX_RUNNING_JOBS, retention=RESULT_RETENTION):
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def _purge(self):
+        cutoff = time.time() - self.retention
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def submit(self, topic, models, max_concurrency=MAX_CONCURRENT_ARTICLES, article_timeout=ARTICLE_TIMEOUT,
+               cache=None, token_budget=None):
+        """Return the id of the job analysing topic, starting one if none can be shared."""
+        # Concurrency and timeouts don't change what the report is about, compression does
+        key = (normalize_topic(topic), token_budget)
+        with self._lock:
+            self._purge()
+            job = self._by_key.get(key)
+            if job is not None and job.status != "failed":
+                job.subscribe()
+                return job.id
+            job = AnalysisJob(topic, key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        self._pool.submit(self._run, job, models, max_concurrency, article_timeout, cache, token_budget)
+        return job.id
+
+    def _run(self, job, models, max_concurrency, article_timeout, cache, token_budget):
+        job.start()
+        try:
+            for stage, value in iter_analysis(job.topic, models, max_concurrency, article_timeout, cache, token_budget):
+                job.apply(stage, value)
+        except Exception as e:
+            logger.exception("Analysis of %r failed", job.topic)
+            job.finish(error=str(e) or type(e).__name__)
+        else:
+            job.finish()
+
+    def get(self, job_id):
+        """The job with job_id, or None once it has expired."""
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+        return _default_manager
@@ -0,0 +1,329 @@
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+# Shared helpers live in common/ at the repository root
+ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from phi.tools.duckduckgo import DuckDuckGo
+
+from article_cache import normalize_url
+from common.rate_limit import BATCH, request_priority
+from common.response_cache import cached_run, get_response_cache
+from common.routing import ModelRouter, run_routed
+from common.tracing import get_tracer
+from pipeline import (
+    ARTICLE_TIMEOUT, MAX_CONCURRENT_ARTICLES, build_news_collector, build_trend_analyzer, compress, extract_urls,
+    fetch_articles, summarize_articles,
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = Path(os.getenv("MONITOR_INDEX_PATH", Path.home() / ".cache" / "ai-agents" / "monitor.sqlite3"))
+# Seconds between two checks of the same topic
+CHECK_INTERVAL = 4 * 3600
+# Articles whose SimHash fingerprints differ in at most this many of 64 bits are the same story
+SIMHASH_DISTANCE = 3
+SHINGLE_WORDS = 3
+# Earlier summaries given to the report update as context, newest first, each cut to a few words
+EARLIER_SUMMARIES = 20
+EARLIER_SUMMARY_WORDS = 60
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def simhash(text, shingle_words=SHINGLE_WORDS):
+    """64-bit SimHash of the word shingles of text, near-identical texts differ in few bits."""
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = [" ".join(words[i:i + shingle_words]) for i in range(max(1, len(words) - shingle_words + 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def _signed(fingerprint):
+    # SQLite integers are signed 64-bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def _unsigned(fingerprint):
+    return fingerprint + (1 << 64) if fingerprint < 0 else fingerprint
+
+
+class MonitorIndex:
+    """SQLite index of the articles seen for each monitored topic and the topic's current report.
+
+    Every URL the collector returned is recorded, including articles that could not
+    be read or were near-duplicates, so none of them is downloaded again.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "topic TEXT NOT NULL, url TEXT NOT NULL, title TEXT, fingerprint INTEGER, summary TEXT, "
+                "seen REAL NOT NULL, PRIMARY KEY (topic, url))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "topic TEXT PRIMARY KEY, report TEXT NOT NULL, articles INTEGER NOT NULL, updated REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def unseen(self, topic, urls):
+        """The urls not yet recorded for topic, in their original order."""
+        with self._connect() as conn:
+            seen = {row[0] for row in conn.execute("SELECT url FROM articles WHERE topic = ?", (topic,))}
+        return [url for url in urls if normalize_url(url) not in seen]
+
+    def fingerprints(self, topic):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT fingerprint FROM articles WHERE topic = ? AND fingerprint IS NOT NULL", (topic,)
+            ).fetchall()
+        return [_unsigned(row[0]) for row in rows]
+
+    def record(self, topic, url, title=None, fingerprint=None, summary=None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO articles (topic, url, title, fingerprint, summary, seen) VALUES (?, ?, ?, ?, ?, ?)",
+                (topic, normalize_url(url), title, None if fingerprint is None else _signed(fingerprint), summary,
+                 time.time()),
+            )
+
+    def summaries(self, topic, limit):
+        """(title, url, summary) of the newest summarized articles of topic."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT title, url, summary FROM articles WHERE topic = ? AND summary IS NOT NULL "
+                "ORDER BY seen DESC LIMIT ?",
+                (topic, limit),
+            ).fetchall()
+
+    def report(self, topic):
+        with self._connect() as conn:
+            row = conn.execute("SELECT report FROM reports WHERE topic = ?", (topic,)).fetchone()
+        return row[0] if row else None
+
+    def save_report(self, topic, report, articles):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO reports (topic, report, articles, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (topic) DO UPDATE SET report = excluded.report, "
+                "articles = reports.articles + excluded.articles, updated = excluded.updated",
+                (topic, report, articles, time.time()),
+            )
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_monitor_index():
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = MonitorIndex()
+        return _default_index
+
+
+def drop_near_duplicates(articles, known, max_distance=SIMHASH_DISTANCE):
+    """Split articles into (new, duplicates) by SimHash against known fingerprints and each other.
+
+    Returns the new articles with their fingerprints as (article, fingerprint) pairs.
+    """
+    fingerprints = list(known)
+    new, duplicates = [], []
+    for article in articles:
+        fingerprint = simhash(article["text"])
+        if any(hamming_distance(fingerprint, other) <= max_distance for other in fingerprints):
+            duplicates.append(article)
+        else:
+            new.append((article, fingerprint))
+            fingerprints.append(fingerprint)
+    return new, duplicates
+
+
+def _shorten(text, words):
+    parts = text.split()
+    return " ".join(parts[:words]) + (" ..." if len(parts) > words else "")
+
+
+def build_update_prompt(report, new_summaries, earlier):
+    earlier_text = "\n".join(
+        f"- {title} ({url}): {_shorten(summary, EARLIER_SUMMARY_WORDS)}" for title, url, summary in earlier
+    )
+    return (
+        "Update the trend report below with the new article summaries. Keep the trends that still hold, "
+        "revise the ones the new articles change and add the new ones, and return the complete updated report.\n\n"
+        f"Current report:\n{report}\n\n"
+        f"New article summaries:\n{new_summaries}\n\n"
+        f"Earlier article summaries, for context:\n{earlier_text or 'None'}"
+    )
+
+
+def check_topic(topic, models, index=None, cache=None, max_concurrency=MAX_CONCURRENT_ARTICLES,
+                article_timeout=ARTICLE_TIMEOUT, token_budget=None):
+    """Look for new articles on topic and fold them into its report.
+
+    Only articles whose URL and fingerprint are new get downloaded, summarized and
+    passed to the Trend Analyzer together with the current report. Returns a dict
+    with the counts of each step and the report, unchanged when nothing was new.
+    """
+    index = index or get_monitor_index()
+    result = {"topic": topic, "found": 0, "new": 0, "duplicates": 0, "summarized": 0, "updated": False}
+    with get_tracer().span("monitor_topic", kind="pipeline", topic=topic) as span:
+        # The collector must search again on every check, so it goes through neither the response
+        # cache nor the search cache, which would answer with the previous check's results
+        search_tool = DuckDuckGo(search=True, news=True, fixed_max_results=5)
+        collected = run_routed(
+            models, "journalist.news_collector", partial(build_news_collector, search_tool=search_tool),
+            f"Collect recent news on {topic}", validate=lambda content: bool(extract_urls(content)),
+        ).content
+        urls = extract_urls(collected)
+        new_urls = index.unseen(topic, urls)
+        result.update(found=len(urls), new=len(new_urls))
+
+        fetched = fetch_articles(new_urls, max_concurrency, article_timeout)
+        fetched_urls = {article["url"] for article in fetched}
+        for url in new_urls:
+            if url not in fetched_urls:
+                index.record(topic, url)
+
+        new, duplicates = drop_near_duplicates(fetched, index.fingerprints(topic))
+        result["duplicates"] = len(duplicates)
+        for article in duplicates:
+            index.record(topic, article["url"], article["title"], simhash(article["text"]))
+
+        fingerprints = {article["url"]: fingerprint for article, fingerprint in new}
+        articles = [article for article, _ in new]
+        if token_budget and articles:
+            articles, _ = compress(articles, token_budget)
+        summarized = summarize_articles(articles, models, max_concurrency, article_timeout, cache)
+        summarized_urls = {normalize_url(article["url"]) for article, _ in summarized}
+        for article, summary in summarized:
+            index.record(topic, article["url"], article["title"], fingerprints[article["url"]], summary)
+        # Articles without a summary are tried again on the next check
+        result["summarized"] = len(summarized)
+        span.set(**{key: value for key, value in result.items() if key != "topic"})
+
+        report = index.report(topic)
+        if summarized:
+            new_summaries = "\n\n".join(
+                f"### {article['title']}\nSource: {article['url']}\n\n{summary}" for article, summary in summarized
+            )
+            earlier = [
+                row for row in index.summaries(topic, EARLIER_SUMMARIES + len(summarized)) if row[1] not in summarized_urls
+            ][:EARLIER_SUMMARIES]
+            trend_analyzer = build_trend_analyzer(models.model("journalist.trend_analyzer"))
+            if report:
+                prompt = build_update_prompt(report, new_summaries, earlier)
+            else:
+                prompt = f"Analyze trends from the following summaries:\n{new_summaries}"
+            report = cached_run(trend_analyzer, prompt, cache).content
+            index.save_report(topic, report, len(summarized))
+            result["updated"] = True
+    result["report"] = report
+    return result
+
+
+def write_report(out_dir, topic, report):
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.casefold()).strip("-") or "topic"
+    path = Path(out_dir) / f"{slug}.md"
+    path.write_text(f"# {topic}\n\n_Updated {time.strftime('%Y-%m-%d %H:%M')}_\n\n{report}\n", encoding="utf-8")
+    return path
+
+
+def run_monitor(topics, models, interval=CHECK_INTERVAL, once=False, out_dir=None, **kwargs):
+    """Check every topic, then again every interval seconds until interrupted (or once)."""
+    if out_dir:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+    while True:
+        started = time.monotonic()
+        for topic in topics:
+            try:
+                # Interactive analyses sharing the Groq quota in this process go first
+                with request_priority(BATCH):
+                    result = check_topic(topic, models, **kwargs)
+            except Exception as e:
+                logger.warning("Checking %r failed: %s", topic, e)
+                continue
+            logger.info(
+                "%s: %d links, %d new, %d near-duplicates, %d summarized%s", topic, result["found"], result["new"],
+                result["duplicates"], result["summarized"], ", report updated" if result["updated"] else "",
+            )
+            if out_dir and result["report"]:
+                write_report(out_dir, topic, result["report"])
+        if once:
+            return
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def read_topics(topics, topic_file=None):
+    topics = list(topics or [])
+    if topic_file:
+        for line in Path(topic_file).read_text().splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                topics.append(line)
+    return list(dict.fromkeys(topics))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch topics for new articles and keep a trend report per topic up to date."
+    )
+    parser.add_argument("topics", nargs="*", help="Topics to monitor, e.g. 'AI startups in healthcare'")
+    parser.add_argument("-f", "--file", help="File with one topic per line ('#' starts a comment)")
+    parser.add_argument("-o", "--out", help="Also write each report to <out>/<topic>.md")
+    parser.add_argument("--interval", type=float, default=CHECK_INTERVAL / 3600,
+                        help=f"Hours between checks (default: {CHECK_INTERVAL / 3600:g})")
+    parser.add_argument("--once", action="store_true", help="Check every topic once and exit, e.g. from cron")
+    parser.add_argument("--token-budget", type=int, help="Compress articles to this many tokens before summarizing")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the local response cache for summaries")
+    args = parser.parse_args()
+
+    topics = read_topics(args.topics, args.file)
+    if not topics:
+        parser.error("no topics given")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    get_tracer("journalist")
+    # Reads GROQ_API_KEY from the environment
+    run_monitor(
+        topics, ModelRouter(), args.interval * 3600, args.once, args.out,
+        cache=None if args.no_cache else get_response_cache(), token_budget=args.token_budget,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import contextvars
+import logging
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from phi.agent import Agent
+
+from article_cache import CachedNewspaper4k
+from compression import compress_articles
+from common.response_cache import cached_run, cached_stream
+from common.routing import run_routed
+from common.search_cache import CachedDuckDuckGo
+from common.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# Fan-out defaults for the per-article download and summary stages
+MAX_CONCURRENT_ARTICLES = 5
+ARTICLE_TIMEOUT = 45.0
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"'()\[\]]+")
+# Shorter summaries are treated as a failed answer and retried on the fallback model
+MIN_SUMMARY_WORDS = 30
+
+
+# Define News Collector Agent - DuckDuckGo search tool for collecting articles
+def build_news_collector(model, search_tool=None):
+    search_tool = search_tool or CachedDuckDuckGo(search=True, news=True, fixed_max_results=5)
+
+    return Agent(
+        name="News Collector",
+        role="Searches the web for the most recent articles related to the user's specified startup topic. It gathers news from credible sources and filters out irrelevant or outdated information. It will return detailed article titles, links, and short descriptions to ensure that only relevant articles are passed for summarization.",
+        tools=[search_tool],
+        model=model,
+        instructions=[
+            "Search DuckDuckGo for the most recent news articles related to the specified topic.",
+            "Filter the articles based on relevance and publication date, ensuring the articles reflect current trends and information.",
+            "Collect at least 5 articles, ensuring that each article provides meaningful insights into the topic.",
+            "Return detailed information about each article, including the title, source, link and a brief description of the content."
+        ],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+# Define Summary Writer Agent - summarizes one article at a time. The article text is
+# downloaded up front by fetch_article, the Newspaper4k tool is only attached when
+# the writer has to read the links itself.
+def build_summary_writer(model, tools=None):
+    return Agent(
+        name="Summary Writer",
+        role="Reads and extracts key insights from the collected news articles. Summarizes each article in a concise, yet informative way, ensuring all important points are highlighted. It should focus on extracting actionable data related to trends, startup opportunities, and relevant statistics.",
+        tools=tools or [],
+        model=model,
+        instructions=[
+            "Read the articles collected by the News Collector agent thoroughly.",
+            "Summarize each article clearly and concisely, focusing on the key points, data, and trends. Extract relevant insights on emerging startup opportunities, new business ideas, market trends, or any disruptive innovations mentioned in the articles.",
+            "Ensure that the summary provides actionable insights that could be used by an entrepreneur to understand the latest market dynamics in the specified area.",
+            "Provide a well-structured summary for each article, including key takeaways, insights into market behavior, and potential startup ideas."
+        ],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+# Define Trend Analyzer Agent - Analyzes trends from the summaries
+def build_trend_analyzer(model):
+    return Agent(
+        name="Trend Analyzer",
+        role="Analyzes the summaries from the Summary Writer Agent to identify emerging trends and startup opportunities. It should assess the collected data, identify patterns, and make recommendations for entrepreneurs about market gaps and growth opportunities. It will provide a detailed, structured analysis of trends.",
+        model=model,
+        instructions=[
+            "Analyze the summaries provided by the Summary Writer agent to extract key emerging trends and startup opportunities.",
+            "Focus on identifying patterns in the market, such as new technologies, market disruptions, consumer behavior changes, and new business models.",
+            "Assess the viability of each identified trend as a potential startup opportunity. Consider market demand, scalability, competition, and innovation.",
+            "Provide a detailed report that outlines each identified trend, its potential impact, and the types of startups that could thrive in these emerging areas.",
+            "Structure the report clearly and offer actionable insights that an entrepreneur can follow to tap into these opportunities."
+        ],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def extract_urls(text):
+    urls = []
+    for match in URL_PATTERN.findall(text or ""):
+        url = match.rstrip(".,;:*_")
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _describe(item):
+    # Articles are logged by their URL rather than their full text
+    return item.get("url", "item") if isinstance(item, dict) else item
+
+
+def iter_fan_out(items, fn, max_concurrency=MAX_CONCURRENT_ARTICLES, timeout=ARTICLE_TIMEOUT, stage="task"):
+    """Run fn over items on a bounded thread pool, yielding (index, item, result) as they finish.
+
+    Items whose call raises, returns None or runs longer than timeout seconds are
+    dropped. Results are yielded from the calling thread. Every call records a
+    span named after stage, including the time it waited for a worker.
+    """
+    tracer = get_tracer()
+    started = {}
+
+    def run(index, item, queued_at):
+        started[index] = time.monotonic()
+        with tracer.span(stage, kind="task", queued_at=queued_at):
+            return fn(item)
+
+    # Timed-out calls whose threads are still running, a worker is free again once its call returns
+    abandoned = set()
+    pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="article")
+    # Each task runs in a copy of the caller's context so its span joins the caller's trace
+    pending = {
+        pool.submit(contextvars.copy_context().run, run, index, item, time.monotonic()): index
+        for index, item in enumerate(items)
+    }
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning("Dropping %s: %s", _describe(items[index]), e)
+                    continue
+                if result is not None:
+                    yield index, items[index], result
+
+            now = time.monotonic()
+            for future, index in list(pending.items()):
+                if index in started and now - started[index] > timeout:
+                    logger.warning("Dropping %s: no result after %.0fs", _describe(items[index]), timeout)
+                    del pending[future]
+                    abandoned.add(future)
+            abandoned = {future for future in abandoned if not future.done()}
+
+            # Threads can't be interrupted, so once every worker is stuck on an
+            # abandoned item nothing still queued would ever start
+            if pending and len(abandoned) >= max_concurrency:
+                for future, index in pending.items():
+                    future.cancel()
+                    logger.warning("Dropping %s: all workers timed out", _describe(items[index]))
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fan_out(items, fn, max_concurrency=MAX_CONCURRENT_ARTICLES, timeout=ARTICLE_TIMEOUT, stage="task"):
+    """Like iter_fan_out, but waits for every item and returns (item, result) pairs in the original order."""
+    results = sorted(iter_fan_out(items, fn, max_concurrency, timeout, stage), key=lambda entry: entry[0])
+    return [(item, result) for _, item, result in results]
+
+
+def fetch_article(url, news_tool):
+    data = news_tool.get_article_data(url)
+    if not data or not data.get("text"):
+        raise ValueError("no article text found")
+    return {
+        "url": url,
+        "title": data.get("title") or url,
+        "text": data["text"],
+        "publish_date": data.get("publish_date"),
+    }
+
+
+def fetch_articles(urls, max_concurrency=MAX_CONCURRENT_ARTICLES, timeout=ARTICLE_TIMEOUT):
+    news_tool = CachedNewspaper4k(read_article=True, include_summary=True)
+    results = fan_out(urls, lambda url: fetch_article(url, news_tool), max_concurrency, timeout, "fetch_article")
+    return [article for _, article in results]
+
+
+def summarize_article(article, models, cache=None):
+    prompt = f"Summarize the following article:\nTitle: {article['title']}\nSource: {article['url']}\n"
+    if article.get("publish_date"):
+        prompt += f"Published: {article['publish_date']}\n"
+    prompt += f"\n{article['text']}"
+    # Agents keep per-run state, so every concurrent summary gets its own writer
+    return run_routed(
+        models, "journalist.summary_writer", build_summary_writer, prompt, cache,
+        validate=lambda content: isinstance(content, str) and len(content.split()) >= MIN_SUMMARY_WORDS,
+    ).content
+
+
+def summarize_and_pair(article, models, cache=None):
+    summary = summarize_article(article, models, cache)
+    return None if summary is None else (article, summary)
+
+
+def read_and_summarize(url, news_tool, models, cache=None):
+    """Download and summarize one article, in a single task so a slow site only delays its own summary."""
+    return summarize_and_pair(fetch_article(url, news_tool), models, cache)
+
+
+def summarize_articles(articles, models, max_concurrency=MAX_CONCURRENT_ARTICLES, timeout=ARTICLE_TIMEOUT, cache=None):
+    return fan_out(
+        articles, lambda article: summarize_article(article, models, cache), max_concurrency, timeout, "summarize_article"
+    )
+
+
+def merge_summaries(summarized):
+    sections = []
+    for article, summary in summarized:
+        sections.append(f"### {article['title']}\nSource: {article['url']}\n\n{summary}")
+    return "\n\n".join(sections)
+
+
+def compress(articles, token_budget):
+    with get_tracer().span("compress_articles", kind="task") as span:
+        articles, stats = compress_articles(articles, token_budget)
+        span.set(**stats)
+    logger.info(
+        "Compressed %d articles from %d to %d tokens", stats["articles"], stats["tokens_before"], stats["tokens_after"]
+    )
+    return articles, stats
+
+
+def iter_analysis(topic, models, max_concurrency=MAX_CONCURRENT_ARTICLES, article_timeout=ARTICLE_TIMEOUT, cache=None,
+                  token_budget=None):
+    """Run the pipeline, yielding (stage, value) events so callers can show partial results.
+
+    models is a ModelRouter that picks the model of every agent. Stages, in order:
+    "articles" with the collector output, "compression" with the compress_articles
+    stats when a per-article token_budget is given, "summary" with an (article,
+    summary) pair for every article as its summary finishes, "summaries" with the
+    merged summaries, "analysis_delta" with each chunk of the trend report and
+    finally "analysis" with the full report.
+    """
+    with get_tracer().span("analysis", kind="pipeline", topic=topic):
+        # Step 1: Collect news, on a small model that is escalated when it returns no links
+        news_response = run_routed(
+            models, "journalist.news_collector", build_news_collector, f"Collect recent news on {topic}", cache,
+            validate=lambda content: bool(extract_urls(content)),
+        )
+        articles = news_response.content
+        yield "articles", articles
+
+        # Step 2: Download and summarize every article in parallel
+        urls = extract_urls(articles)
+        if token_budget:
+            # Compression drops sentences repeated across articles, so every download has to finish first
+            fetched, stats = compress(fetch_articles(urls, max_concurrency, article_timeout), token_budget)
+            yield "compression", stats
+            items, stage = fetched, "summarize_article"
+            process = lambda article: summarize_and_pair(article, models, cache)
+        else:
+            # One download-and-summary task per article, an article's summary starts as soon as it is read
+            news_tool = CachedNewspaper4k(read_article=True, include_summary=True)
+            items, stage = urls, "read_and_summarize"
+            process = lambda url: read_and_summarize(url, news_tool, models, cache)
+
+        summarized = []
+        for index, _, (article, summary) in iter_fan_out(items, process, max_concurrency, article_timeout, stage):
+            summarized.append((index, article, summary))
+            yield "summary", (article, summary)
+
+        if urls and len(summarized) < len(urls):
+            # Each failed article was logged as it was dropped
+            logger.warning("Summarized %d of %d articles on %r", len(summarized), len(urls), topic)
+
+        if summarized:
+            summarized.sort(key=lambda entry: entry[0])
+            summaries = merge_summaries((article, summary) for _, article, summary in summarized)
+        elif urls:
+            # The links were found but none could be read or summarized in time, reading them again one
+            # by one would only wait on the same slow sites, so the trends come from the collector's notes
+            summaries = articles
+        else:
+            # No readable links in the collector output, let the writer read the articles itself
+            news_tool = CachedNewspaper4k(read_article=True, include_summary=True)
+            summary_response = cached_run(
+                build_summary_writer(models.model("journalist.summary_writer"), tools=[news_tool]),
+                f"Summarize the following articles:\n{articles}", cache
+            )
+            summaries = summary_response.content
+        yield "summaries", summaries
+
+        # Step 3: Analyze trends
+        parts = []
+        trend_analyzer = build_trend_analyzer(models.model("journalist.trend_analyzer"))
+        for delta in cached_stream(trend_analyzer, f"Analyze trends from the following summaries:\n{summaries}", cache):
+            parts.append(delta)
+            yield "analysis_delta", delta
+        yield "analysis", "".join(parts)
+
+
+def run_analysis(topic, models, max_concurrency=MAX_CONCURRENT_ARTICLES, article_timeout=ARTICLE_TIMEOUT, cache=None,
+                 token_budget=None):
+    analysis = None
+    for stage, value in iter_analysis(topic, models, max_concurrency, article_timeout, cache, token_budget):
+        if stage == "analysis":
+            analysis = value
+    return analysis
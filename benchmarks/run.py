@@ -0,0 +1,326 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from stub_server import StubConfig, StubDDGS, StubServer
+
+logger = logging.getLogger("benchmark")
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_DIRS = ("Journalist_Agent", "Health_Agent", "Financial-agent")
+SCENARIOS = ("journalist", "health", "financial", "financial-prefetch")
+
+STUB_API_KEY = "stub"
+JOURNALIST_TOPIC = "AI startups in healthcare"
+HEALTH_QUESTIONS = (
+    "Can I swap the dinner for something quicker to cook?",
+    "How many rest days should I take each week?",
+    "What should I eat before a workout?",
+)
+FINANCIAL_QUERY = "Summarize analyst recommendations and share the latest news for NVDA stock and detailed report also"
+FINANCIAL_SYMBOLS = ("NVDA",)
+
+
+def configure_environment(server_url, work_dir):
+    """Point every provider and on-disk cache at the stub server and a scratch directory.
+
+    Must run before the app modules are imported, they read these variables at import time.
+    """
+    os.environ.update({
+        "GROQ_API_KEY": STUB_API_KEY,
+        "GROQ_BASE_URL": server_url,
+        "GOOGLE_API_KEY": STUB_API_KEY,
+        "TRACE_DIR": str(work_dir / "traces"),
+        "TRACE_SERVICE": "benchmark",
+        "RESPONSE_CACHE_PATH": str(work_dir / "responses.sqlite3"),
+        "ARTICLE_CACHE_DIR": str(work_dir / "articles"),
+        "MARKET_DATA_DIR": str(work_dir / "market-data"),
+        "MARKET_DATA_OFFLINE": "1",
+    })
+    # The stubs have no quota, only measure the client-side limiter when it is configured explicitly
+    os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "1000000000")
+    for path in (ROOT_DIR, *(ROOT_DIR / name for name in APP_DIRS)):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+    import phi.tools.duckduckgo
+
+    StubDDGS.base_url = server_url
+    phi.tools.duckduckgo.DDGS = StubDDGS
+
+
+def gemini_model(server_url):
+    from phi.model.google import Gemini
+
+    return Gemini(
+        id="gemini-1.5-flash",
+        api_key=STUB_API_KEY,
+        client_params={"transport": "rest", "client_options": {"api_endpoint": server_url}},
+    )
+
+
+def seed_market_store(server_url, symbols=FINANCIAL_SYMBOLS):
+    """Write a year of synthetic prices, info, recommendations and news for symbols into the store."""
+    import pandas as pd
+    from market_store import STORE_DIR, MarketDataStore
+
+    store = MarketDataStore(STORE_DIR, offline=False)
+    days = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=260)
+    for symbol in symbols:
+        rng = random.Random(symbol)
+        closes = [100.0]
+        for _ in range(len(days) - 1):
+            closes.append(round(closes[-1] * (1 + rng.gauss(0.0005, 0.02)), 2))
+        store.save_history(symbol, pd.DataFrame({
+            "Open": [round(close * (1 + rng.uniform(-0.01, 0.01)), 2) for close in closes],
+            "High": [round(close * 1.015, 2) for close in closes],
+            "Low": [round(close * 0.985, 2) for close in closes],
+            "Close": closes,
+            "Adj Close": closes,
+            "Volume": [rng.randint(10_000_000, 60_000_000) for _ in closes],
+        }, index=days))
+        store.record(symbol, "quote", lambda: closes[-1])
+        store.record(symbol, "info", lambda: {
+            "longName": f"{symbol} Corporation", "sector": "Technology", "industry": "Semiconductors",
+            "marketCap": 2_000_000_000_000, "forwardPE": 35.2, "priceToBook": 40.1, "dividendYield": 0.0003,
+            "trailingEps": 2.5, "beta": 1.7, "fiftyTwoWeekHigh": max(closes), "fiftyTwoWeekLow": min(closes),
+        })
+        store.record(symbol, "recommendations", lambda: [
+            {"period": period, "strongBuy": 12, "buy": 24, "hold": 6, "sell": 1, "strongSell": 0}
+            for period in ("0m", "-1m", "-2m", "-3m")
+        ])
+        store.record(symbol, "news", lambda: [
+            {"title": f"{symbol} story {index}", "publisher": "Stub News", "link": f"{server_url}/articles/{symbol.lower()}-{index}"}
+            for index in range(5)
+        ])
+
+
+def journalist_scenario(server_url, args):
+    from common.routing import ModelRouter
+    from pipeline import run_analysis
+
+    def run_once(index):
+        # Stages are routed as in the app, set MODEL_ROUTES to compare routings
+        run_analysis(f"{JOURNALIST_TOPIC} {index}", ModelRouter(api_key=STUB_API_KEY),
+                     token_budget=args.article_token_budget)
+
+    return run_once
+
+
+def health_scenario(server_url, args):
+    from planner import build_user_profile, generate_plans
+    from qa import PlanQA
+
+    def run_once(index):
+        model = gemini_model(server_url)
+        user_profile = build_user_profile(
+            20 + index % 50, 70, 175, "Female", "Moderately Active", "Vegetarian", "Lose Weight"
+        )
+        plans = {}
+        for kind, event, value in generate_plans(model, user_profile):
+            if event == "error":
+                raise value
+            if event == "done":
+                plans[kind] = value
+        # A short conversation, as in the Q&A section of Health_Agent/agent.py
+        plan_qa = PlanQA(model, plans["dietary"], plans["fitness"])
+        for question in HEALTH_QUESTIONS:
+            for _ in plan_qa.ask(question):
+                pass
+
+    return run_once
+
+
+def financial_scenario(server_url, args):
+    seed_market_store(server_url)
+    from financial_agent import run_team
+
+    def run_once(index):
+        run_team(FINANCIAL_QUERY)
+
+    return run_once
+
+
+def financial_prefetch_scenario(server_url, args):
+    seed_market_store(server_url)
+    from prefetch import prefetch_report
+
+    def run_once(index):
+        prefetch_report(FINANCIAL_SYMBOLS[index % len(FINANCIAL_SYMBOLS)])
+
+    return run_once
+
+
+SCENARIO_SETUP = {
+    "journalist": journalist_scenario,
+    "health": health_scenario,
+    "financial": financial_scenario,
+    "financial-prefetch": financial_prefetch_scenario,
+}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def stage_latencies(before, after):
+    """Count and mean wall time of the agent, task and tool spans recorded between two Tracer.stats() calls."""
+    stages = {}
+    for (kind, name), value in sorted(after.items()):
+        previous = before.get((kind, name), {"count": 0, "seconds": 0.0})
+        count = value["count"] - previous["count"]
+        if kind in ("agent", "task", "tool") and count:
+            stages[f"{kind}:{name}"] = {"count": count, "mean": (value["seconds"] - previous["seconds"]) / count}
+    return stages
+
+
+def run_level(run_once, server, concurrency, requests, first_index=0):
+    """Run requests end-to-end requests with at most concurrency in flight."""
+    from common.tracing import get_tracer
+
+    def timed(index):
+        started = time.perf_counter()
+        run_once(index)
+        return time.perf_counter() - started
+
+    before = server.snapshot()
+    spans_before = get_tracer().stats()
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        futures = [pool.submit(timed, first_index + index) for index in range(requests)]
+        for future in as_completed(futures):
+            try:
+                latencies.append(future.result())
+            except Exception as e:
+                errors += 1
+                logger.warning("Request failed: %s: %s", type(e).__name__, e)
+    elapsed = time.perf_counter() - started
+    calls = server.snapshot()
+    calls.subtract(before)
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "llm_calls_per_request": calls["llm_calls"] / requests,
+        "prompt_tokens_per_request": calls["prompt_tokens"] / requests,
+        "search_calls": calls["search_calls"],
+        "article_calls": calls["article_calls"],
+        "injected_failures": calls["groq_failures"] + calls["gemini_failures"],
+        "llm_calls_by_model": {
+            key.split(":", 1)[1]: count for key, count in sorted(calls.items()) if key.startswith("llm_calls:") and count
+        },
+        "stages": stage_latencies(spans_before, get_tracer().stats()),
+    }
+
+
+def format_table(results):
+    def seconds(value):
+        return f"{value:.2f}" if value is not None else "-"
+
+    header = f"{'scenario':<20}{'conc':>6}{'reqs':>6}{'errors':>8}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'req/s':>8}{'llm/req':>9}{'tok/req':>9}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result['scenario']:<20}{result['concurrency']:>6}{result['requests']:>6}{result['errors']:>8}"
+            f"{seconds(result['p50']):>9}{seconds(result['p95']):>9}{seconds(result['p99']):>9}"
+            f"{result['throughput']:>8.2f}{result['llm_calls_per_request']:>9.1f}"
+            f"{result['prompt_tokens_per_request']:>9.0f}"
+        )
+    return "\n".join(lines)
+
+
+def format_stages(results):
+    header = f"{'scenario':<20}{'conc':>6}  {'stage':<40}{'count':>7}{'mean s':>9}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        for stage, value in result["stages"].items():
+            lines.append(
+                f"{result['scenario']:<20}{result['concurrency']:>6}  {stage[:40]:<40}{value['count']:>7}{value['mean']:>9.2f}"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the three apps end-to-end against local stand-ins for Groq, Gemini, DuckDuckGo and news sites."
+    )
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run, may be repeated (default: all)")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated concurrency levels (default: 1,4,8)")
+    parser.add_argument("--requests", type=int, default=8, help="Requests per concurrency level (default: 8)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured requests before each scenario (default: 1)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds to the first LLM token (default: 0.3)")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="LLM tokens per second (default: 200)")
+    parser.add_argument("--completion-tokens", type=int, default=120, help="Tokens per LLM answer (default: 120)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of LLM requests that fail (default: 0)")
+    parser.add_argument("--failure-status", type=int, default=503, choices=(429, 500, 503),
+                        help="HTTP status of injected failures (default: 503)")
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SECONDS",
+                        help="First-token latency of one model id, may be repeated")
+    parser.add_argument("--search-latency", type=float, default=0.2, help="Seconds per search request (default: 0.2)")
+    parser.add_argument("--article-latency", type=float, default=0.1, help="Seconds per article download (default: 0.1)")
+    parser.add_argument("--article-failure-rate", type=float, default=0.0,
+                        help="Share of article downloads that return 404 (default: 0)")
+    parser.add_argument("--article-token-budget", type=int,
+                        help="Compress Journalist articles to this many tokens before summarizing (default: off)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for failure injection (default: 0)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    config = StubConfig(
+        latency=args.latency, token_rate=args.token_rate, completion_tokens=args.completion_tokens,
+        failure_rate=args.failure_rate, failure_status=args.failure_status, search_latency=args.search_latency,
+        article_latency=args.article_latency, article_failure_rate=args.article_failure_rate, seed=args.seed,
+        model_latency={model: float(seconds) for model, seconds in (item.split("=", 1) for item in args.model_latency)},
+    )
+    server = StubServer(config=config).start()
+    work_dir = Path(tempfile.mkdtemp(prefix="agents-benchmark-"))
+    configure_environment(server.url, work_dir)
+    print(f"Stub providers on {server.url}, caches and traces in {work_dir}")
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    results = []
+    print(format_table([]))
+    for scenario in args.scenario or SCENARIOS:
+        run_once = SCENARIO_SETUP[scenario](server.url, args)
+        # Request indexes vary the topics and profiles, so later requests don't just hit the caches
+        next_index = 0
+        if args.warmup:
+            run_level(run_once, server, 1, args.warmup, next_index)
+            next_index += args.warmup
+        for concurrency in levels:
+            result = run_level(run_once, server, concurrency, args.requests, next_index)
+            next_index += args.requests
+            results.append({"scenario": scenario, **result})
+            print(format_table(results[-1:]).splitlines()[-1], flush=True)
+
+    print()
+    print(format_table(results))
+    print()
+    print(format_stages(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps({"config": vars(config), "results": results}, indent=2), encoding="utf-8")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
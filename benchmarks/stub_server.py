@@ -0,0 +1,395 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+WORDS = (
+    "market growth demand supply investors analysts revenue quarter outlook policy regulators "
+    "technology adoption consumers pricing competition forecast risk earnings momentum sector "
+    "strategy launch partnership research data trend report signal shift expansion capacity"
+).split()
+
+# Lines every stub article carries, so boilerplate removal has something to remove
+BOILERPLATE = (
+    "Subscribe to our newsletter for the latest updates.",
+    "Advertisement",
+    "Sign up for free to keep reading.",
+    "Copyright 2026 Stub News. All rights reserved.",
+)
+# Sentences shared by several stub articles, like syndicated wire copy
+SYNDICATED = (
+    "The announcement was first reported by a wire service on Monday morning.",
+    "Analysts expect further details to emerge in the coming weeks.",
+    "Shares in the sector moved sharply after the news broke.",
+)
+
+URL_PATTERN = re.compile(r"https?://[^\s\"'<>)\]]+/articles/[\w.-]+")
+
+
+class StubConfig:
+    """Behaviour of the stub providers.
+
+    latency is the time to the first token of an LLM response, token_rate the
+    tokens per second after that and completion_tokens the length of every
+    answer. failure_rate is the share of LLM requests rejected with
+    failure_status (429 responses carry a retry-after header). model_latency
+    overrides latency for individual model ids.
+    """
+
+    def __init__(self, latency=0.3, token_rate=200.0, completion_tokens=120, failure_rate=0.0, failure_status=503,
+                 retry_after=1, search_latency=0.2, article_latency=0.1, article_failure_rate=0.0,
+                 article_paragraphs=12, model_latency=None, seed=0):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.completion_tokens = completion_tokens
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.retry_after = retry_after
+        self.search_latency = search_latency
+        self.article_latency = article_latency
+        self.article_failure_rate = article_failure_rate
+        self.article_paragraphs = article_paragraphs
+        self.model_latency = model_latency or {}
+        self.seed = seed
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _rng(*parts):
+    return random.Random(hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest())
+
+
+def _sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 16))]
+    return " ".join(words).capitalize() + "."
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:48] or "topic"
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), config=None):
+        super().__init__(address, StubHandler)
+        self.config = config or StubConfig()
+        self.counters = Counter()
+        self._counters_lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._random_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, *keys, amount=1):
+        with self._counters_lock:
+            for key in keys:
+                self.counters[key] += amount
+
+    def snapshot(self):
+        with self._counters_lock:
+            return Counter(self.counters)
+
+    def should_fail(self, rate):
+        with self._random_lock:
+            return self._random.random() < rate
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="stub-server", daemon=True).start()
+        return self
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions (Groq), Gemini generateContent, search and article pages."""
+
+    server_version = "StubProviders/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type):
+        # HTTP/1.0 responses without a length end when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _write(self, text):
+        self.wfile.write(text.encode())
+        self.wfile.flush()
+
+    def _inject_failure(self, provider):
+        if not self.server.should_fail(self.config.failure_rate):
+            return False
+        status = self.config.failure_status
+        self.server.count(f"{provider}_failures")
+        if status == 429:
+            error = {"message": "Rate limit reached (stub)", "type": "tokens", "code": "rate_limit_exceeded"}
+            self._send_json({"error": error}, status, {"retry-after": self.config.retry_after})
+        else:
+            self._send_json({"error": {"code": status, "message": "Service unavailable (stub)", "status": "UNAVAILABLE"}}, status)
+        return True
+
+    def _completion_text(self, model, prompt, urls=()):
+        rng = _rng(model, prompt)
+        words = [rng.choice(WORDS) for _ in range(self.config.completion_tokens)]
+        text = " ".join(words)
+        if urls:
+            # Agents asked to list sources get the URLs their search tools returned
+            text = "Sources:\n" + "\n".join(f"- {url}" for url in dict.fromkeys(urls)) + "\n\n" + text
+        return text
+
+    def _chunks(self, text):
+        return re.findall(r"\S+\s*", text)
+
+    def _sleep_first_token(self, model):
+        time.sleep(self.config.model_latency.get(model, self.config.latency))
+
+    def _sleep_tokens(self, count):
+        if self.config.token_rate:
+            time.sleep(count / self.config.token_rate)
+
+    # Routing
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path.startswith("/ddg/"):
+            return self._search(parts.path.rsplit("/", 1)[-1], parse_qs(parts.query))
+        if parts.path.startswith("/articles/"):
+            return self._article(parts.path.rsplit("/", 1)[-1])
+        if parts.path == "/stats":
+            return self._send_json(dict(self.server.snapshot()))
+        self._send_json({"error": {"message": f"Unknown path {parts.path}"}}, 404)
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path.endswith("/chat/completions"):
+            return self._chat_completion(self._read_json())
+        match = re.search(r"/models/([^/:]+):(generateContent|streamGenerateContent)$", path)
+        if match:
+            return self._generate_content(match.group(1), match.group(2) == "streamGenerateContent", self._read_json())
+        self._send_json({"error": {"message": f"Unknown path {path}"}}, 404)
+
+    # Groq (OpenAI-compatible chat completions)
+
+    def _tool_calls(self, tools, messages):
+        question = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        query = " ".join(str(question).split()[:12]) or "stub topic"
+        calls = []
+        for tool in tools:
+            function = tool.get("function", {})
+            parameters = function.get("parameters") or {}
+            properties = parameters.get("properties") or {}
+            arguments = {}
+            for name in parameters.get("required") or list(properties)[:1]:
+                kind = (properties.get(name) or {}).get("type")
+                if kind in ("integer", "number"):
+                    arguments[name] = 3
+                elif kind == "boolean":
+                    arguments[name] = True
+                elif "symbol" in name:
+                    arguments[name] = "NVDA"
+                elif "url" in name:
+                    arguments[name] = f"{self.server.url}/articles/{_slug(query)}-0"
+                else:
+                    arguments[name] = query
+            calls.append({
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": function.get("name"), "arguments": json.dumps(arguments)},
+            })
+        return calls
+
+    def _chat_completion(self, request):
+        model = request.get("model", "stub")
+        self.server.count("llm_calls", f"llm_calls:{model}")
+        if self._inject_failure("groq"):
+            return
+
+        messages = request.get("messages") or []
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        prompt_tokens = estimate_tokens(prompt)
+        self.server.count("prompt_tokens", amount=prompt_tokens)
+        # Call every tool once on the first turn, answer once tool results are in
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        has_results = any(m.get("role") == "tool" for m in messages[last_user + 1:])
+        tool_calls = self._tool_calls(request["tools"], messages) if request.get("tools") and not has_results else []
+        if tool_calls:
+            text = ""
+        else:
+            urls = [url for m in messages if m.get("role") == "tool" for url in URL_PATTERN.findall(str(m.get("content")))]
+            text = self._completion_text(model, prompt, urls)
+        completion_tokens = len(self._chunks(text)) or len(tool_calls) * 10
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        finish_reason = "tool_calls" if tool_calls else "stop"
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        self._sleep_first_token(model)
+        if not request.get("stream"):
+            self._sleep_tokens(completion_tokens)
+            message = {"role": "assistant", "content": text or None}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            return self._send_json({
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+                "usage": usage,
+            })
+
+        def event(delta, finish=None, **extra):
+            chunk = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish, "logprobs": None}], **extra,
+            }
+            self._write(f"data: {json.dumps(chunk)}\n\n")
+
+        self._start_stream("text/event-stream")
+        event({"role": "assistant", "content": ""})
+        if tool_calls:
+            event({"tool_calls": [{"index": i, **call} for i, call in enumerate(tool_calls)]})
+        for piece in self._chunks(text):
+            self._sleep_tokens(1)
+            event({"content": piece})
+        # Groq reports usage on the last chunk under x_groq
+        event({}, finish_reason, x_groq={"id": completion_id, "usage": usage})
+        self._write("data: [DONE]\n\n")
+
+    # Gemini (generativelanguage REST)
+
+    def _generate_content(self, model, stream, request):
+        self.server.count("llm_calls", f"llm_calls:{model}")
+        if self._inject_failure("gemini"):
+            return
+
+        texts = [part.get("text", "") for content in request.get("contents") or [] for part in content.get("parts") or []]
+        system = request.get("systemInstruction") or request.get("system_instruction") or {}
+        texts += [part.get("text", "") for part in system.get("parts") or []]
+        prompt = "\n".join(texts)
+        self.server.count("prompt_tokens", amount=estimate_tokens(prompt))
+        text = self._completion_text(model, prompt)
+        pieces = self._chunks(text)
+        usage = {"promptTokenCount": estimate_tokens(prompt), "candidatesTokenCount": len(pieces),
+                 "totalTokenCount": estimate_tokens(prompt) + len(pieces)}
+
+        def response(piece, finish=None):
+            candidate = {"content": {"role": "model", "parts": [{"text": piece}]}, "index": 0}
+            if finish:
+                candidate["finishReason"] = finish
+            return {"candidates": [candidate], "usageMetadata": usage, "modelVersion": model}
+
+        self._sleep_first_token(model)
+        if not stream:
+            self._sleep_tokens(len(pieces))
+            return self._send_json(response(text, "STOP"))
+
+        # The REST transport reads a streamed JSON array, one response object per element
+        self._start_stream("application/json")
+        for index, piece in enumerate(pieces):
+            self._sleep_tokens(1)
+            last = index == len(pieces) - 1
+            self._write(("[" if index == 0 else ",") + json.dumps(response(piece, "STOP" if last else None)))
+        self._write("]" if pieces else "[]")
+
+    # DuckDuckGo and article sites
+
+    def _search(self, kind, params):
+        self.server.count("search_calls")
+        time.sleep(self.config.search_latency)
+        query = (params.get("q") or ["stub topic"])[0]
+        max_results = int((params.get("max_results") or [5])[0])
+        rng = _rng("search", kind, query)
+        results = []
+        for index in range(max_results):
+            url = f"{self.server.url}/articles/{quote(_slug(query))}-{index}"
+            title = _sentence(rng).rstrip(".")
+            body = _sentence(rng)
+            if kind == "news":
+                results.append({"date": "2026-10-01T08:00:00+00:00", "title": title, "body": body,
+                                "url": url, "image": None, "source": "Stub News"})
+            else:
+                results.append({"title": title, "href": url, "body": body})
+        self._send_json(results)
+
+    def _article(self, slug):
+        self.server.count("article_calls")
+        time.sleep(self.config.article_latency)
+        if self.server.should_fail(self.config.article_failure_rate):
+            self.server.count("article_failures")
+            return self._send_json({"error": {"message": "Not found (stub)"}}, 404)
+
+        rng = _rng("article", slug)
+        title = _sentence(rng).rstrip(".")
+        paragraphs = []
+        for index in range(self.config.article_paragraphs):
+            sentences = [_sentence(rng) for _ in range(rng.randint(3, 6))]
+            if index % 4 == 1:
+                sentences.append(SYNDICATED[index // 4 % len(SYNDICATED)])
+            paragraphs.append(" ".join(sentences))
+            if index % 5 == 2:
+                paragraphs.append(BOILERPLATE[index // 5 % len(BOILERPLATE)])
+        body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+        html = (
+            f"<html><head><title>{title}</title>"
+            '<meta property="article:published_time" content="2026-10-01T08:00:00Z">'
+            '<meta name="author" content="Stub Reporter"></head>'
+            "<body><nav>Home | World | Business | Technology</nav>"
+            f"<article><h1>{title}</h1>{body}</article>"
+            f"<footer>{BOILERPLATE[-1]}</footer></body></html>"
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(html)))
+        self.end_headers()
+        self.wfile.write(html)
+
+
+class StubDDGS:
+    """Drop-in for duckduckgo_search.DDGS that queries a StubServer instead of DuckDuckGo."""
+
+    base_url = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _get(self, kind, keywords, max_results):
+        url = f"{self.base_url}/ddg/{kind}?q={quote(keywords)}&max_results={max_results or 5}"
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return json.load(response)
+
+    def text(self, keywords, max_results=None, **kwargs):
+        return self._get("text", keywords, max_results)
+
+    def news(self, keywords, max_results=None, **kwargs):
+        return self._get("news", keywords, max_results)
@@ -0,0 +1,275 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List
+
+from phi.model.groq import Groq
+from phi.model.message import Message
+
+logger = logging.getLogger(__name__)
+
+# Groq's free tier limits per model, raise them to match your organisation's quota
+REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", 30))
+TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", 6000))
+MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", 8))
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# Completion tokens reserved for a request that sets no max_tokens, settled once the usage is known
+COMPLETION_TOKEN_ESTIMATE = 512
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Lower values are scheduled first
+INTERACTIVE = 0
+BATCH = 10
+
+_priority = ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority):
+    """Schedule model calls made inside the block (and in tasks copying its context) at priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount):
+        """Seconds until amount can be taken, 0 when it can be taken now."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount):
+        # May go negative when actual usage exceeded the estimate, later callers then wait longer
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    """Admits model calls under requests- and tokens-per-minute budgets.
+
+    Waiting calls are admitted strictly in priority order, then in arrival order.
+    The number of calls in flight adapts to rate limiting: it grows by about one
+    per successful round and halves when the provider answers 429, and a
+    retry-after pauses every caller, not just the one that was told.
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_concurrency=MAX_CONCURRENCY, min_concurrency=1):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens, priority=None):
+        entry = (_priority.get() if priority is None else priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    wait = None
+                    if self._waiting[0] == entry and self.in_flight < int(self.concurrency):
+                        wait = max(
+                            self._paused_until - time.monotonic(),
+                            self.requests.wait_time(1),
+                            self.tokens.wait_time(tokens),
+                        )
+                        if wait <= 0:
+                            break
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+
+    def release(self, reserved, used=None, rate_limited=False, retry_after=None):
+        """Finish a call admitted with reserved tokens, settling them against the tokens actually used."""
+        with self._cond:
+            self.in_flight -= 1
+            if used is not None:
+                self.tokens.take(used - reserved)
+            now = time.monotonic()
+            if rate_limited:
+                self.rate_limited += 1
+                # One burst of 429s counts as one signal
+                if now - self._last_decrease > 1.0:
+                    self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+                    self._last_decrease = now
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif used is not None:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "concurrency": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiting),
+                "rate_limited": self.rate_limited,
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key):
+    """Process-wide limiter for key, e.g. a provider and model id sharing one quota."""
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter()
+        return _limiters[key]
+
+
+def status_code(error):
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def retry_after(error):
+    """Seconds the provider asked us to wait, from retry-after-ms or retry-after."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    if status_code(error) in RETRYABLE_STATUS:
+        return True
+    # Connection errors and timeouts carry no status code
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def backoff_delay(attempt, error):
+    """Full-jitter exponential backoff, never shorter than the provider's retry-after."""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    hint = retry_after(error)
+    if hint is not None:
+        delay = hint + random.uniform(0, min(1.0, hint * 0.1))
+    return delay
+
+
+def _usage_tokens(usage):
+    return getattr(usage, "total_tokens", None) if usage is not None else None
+
+
+class RateLimitedGroq(Groq):
+    """Groq model whose calls go through a shared RateLimiter, with retries on 429 and 5xx.
+
+    The SDK's own retries are turned off so every attempt is counted against the
+    limits. Streams are only retried until their first chunk arrives.
+    """
+
+    rate_limit_retries: int = MAX_RETRIES
+
+    def get_client_params(self) -> Dict[str, Any]:
+        # phi leaves out a max_retries of 0, the groq client would then retry twice on its own
+        return {**super().get_client_params(), "max_retries": 0}
+
+    def _limiter(self):
+        return get_rate_limiter(("groq", self.id))
+
+    def _estimate_tokens(self, messages: List[Message]) -> int:
+        text = sum(len(str(message.content or "")) for message in messages)
+        if self.tools:
+            text += len(json.dumps(self.tools, default=str))
+        return text // 4 + (self.max_tokens or COMPLETION_TOKEN_ESTIMATE)
+
+    def _attempts(self, messages):
+        """Yield (attempt, reserved tokens) for each try, sleeping between retries."""
+        limiter = self._limiter()
+        reserved = self._estimate_tokens(messages)
+        for attempt in range(self.rate_limit_retries + 1):
+            limiter.acquire(reserved)
+            yield attempt, reserved
+
+    def _failed(self, attempt, reserved, error):
+        retryable = is_retryable(error)
+        rate_limited = status_code(error) == 429
+        self._limiter().release(
+            reserved, rate_limited=rate_limited, retry_after=retry_after(error) if rate_limited else None
+        )
+        if not retryable or attempt == self.rate_limit_retries:
+            raise error
+        delay = backoff_delay(attempt, error)
+        logger.warning("Groq %s failed (%s), retry %d in %.1fs", self.id, status_code(error) or type(error).__name__,
+                       attempt + 1, delay)
+        time.sleep(delay)
+
+    def invoke(self, messages: List[Message]):
+        for attempt, reserved in self._attempts(messages):
+            try:
+                response = super().invoke(messages)
+            except Exception as e:
+                self._failed(attempt, reserved, e)
+                continue
+            self._limiter().release(reserved, used=_usage_tokens(response.usage) or reserved)
+            return response
+
+    def invoke_stream(self, messages: List[Message]) -> Iterator:
+        for attempt, reserved in self._attempts(messages):
+            stream = super().invoke_stream(messages)
+            try:
+                first = next(stream)
+            except StopIteration:
+                self._limiter().release(reserved, used=reserved)
+                return
+            except Exception as e:
+                self._failed(attempt, reserved, e)
+                continue
+
+            used = None
+            try:
+                yield first
+                for chunk in stream:
+                    # Groq reports the usage of a stream on its last chunk
+                    used = _usage_tokens(getattr(getattr(chunk, "x_groq", None), "usage", None)) or used
+                    yield chunk
+            finally:
+                self._limiter().release(reserved, used=used or reserved)
+            return
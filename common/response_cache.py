@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from phi.run.response import RunResponse
+
+from common.tracing import trace_agent
+
+CACHE_PATH = Path(os.getenv("RESPONSE_CACHE_PATH", Path.home() / ".cache" / "ai-agents" / "responses.sqlite3"))
+CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 24 * 3600))
+# Agents with tools answer from live data (news searches, quotes), so their answers expire as soon as
+# the search cache's news results do (search_cache.NEWS_TTL)
+TOOL_CACHE_TTL = min(CACHE_TTL, int(os.getenv("RESPONSE_CACHE_TOOL_TTL", 15 * 60)))
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _tool_config(tool):
+    functions = getattr(tool, "functions", None)
+    if isinstance(functions, dict):
+        return {"toolkit": type(tool).__name__, "functions": sorted(functions)}
+    return {"function": getattr(tool, "__name__", type(tool).__name__)}
+
+
+def agent_fingerprint(agent):
+    model = agent.model
+    return {
+        "model": [type(model).__name__, model.id] if model else None,
+        "name": agent.name,
+        "role": agent.role,
+        "description": agent.description,
+        "instructions": agent.instructions,
+        "tools": [_tool_config(tool) for tool in agent.tools or []],
+        "team": [agent_fingerprint(member) for member in agent.team or []],
+        "markdown": agent.markdown,
+    }
+
+
+def stream_content(agent, message):
+    """Yield the text chunks of a streamed agent run."""
+    for chunk in agent.run(message, stream=True):
+        if isinstance(chunk.content, str) and chunk.content:
+            yield chunk.content
+
+
+def _run_metrics(agent):
+    # Streamed runs only report their metrics on the agent once the stream is exhausted
+    run_response = getattr(agent, "run_response", None)
+    return run_response.metrics if run_response is not None else None
+
+
+def uses_tools(agent):
+    return bool(agent.tools) or any(uses_tools(member) for member in agent.team or [])
+
+
+def cache_key(agent, message):
+    payload = json.dumps({"agent": agent_fingerprint(agent), "message": message}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of agent responses keyed on the agent configuration and prompt.
+
+    Entries expire after ttl seconds, or tool_ttl for agents that call tools, and the
+    least recently read ones are deleted once the stored content exceeds max_bytes.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, tool_ttl=TOOL_CACHE_TTL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.tool_ttl = min(ttl, tool_ttl)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, created REAL NOT NULL, "
+                "accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, ttl=None):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > (ttl or self.ttl):
+                self._record(hit=False)
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._record(hit=True)
+        return row[0]
+
+    def put(self, key, content):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, content, now, now, len(content.encode())),
+            )
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                evict = []
+                for old_key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((old_key,))
+                    total -= size
+                conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def _ttl(self, agent):
+        return self.tool_ttl if uses_tools(agent) else self.ttl
+
+    def run(self, agent, message):
+        with trace_agent(agent) as span:
+            key = cache_key(agent, message)
+            content = self.get(key, self._ttl(agent))
+            span.cache_hit = content is not None
+            if content is not None:
+                return RunResponse(content=content, model=agent.model.id if agent.model else None)
+
+            response = agent.run(message)
+            span.add_tokens(response.metrics)
+            if isinstance(response.content, str) and response.content:
+                self.put(key, response.content)
+            return response
+
+    def stream(self, agent, message):
+        """Like run, but yields the response text as it arrives. A hit yields it in one chunk."""
+        with trace_agent(agent, stream=True) as span:
+            key = cache_key(agent, message)
+            content = self.get(key, self._ttl(agent))
+            span.cache_hit = content is not None
+            if content is not None:
+                yield content
+                return
+
+            parts = []
+            for delta in stream_content(agent, message):
+                parts.append(delta)
+                yield delta
+            span.add_tokens(_run_metrics(agent))
+            if parts:
+                self.put(key, "".join(parts))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+def cached_run(agent, message, cache=None):
+    """Run the agent through cache when one is given, otherwise call agent.run directly."""
+    if cache is not None:
+        return cache.run(agent, message)
+    with trace_agent(agent) as span:
+        response = agent.run(message)
+        span.add_tokens(response.metrics)
+        return response
+
+
+def _traced_stream(agent, message):
+    with trace_agent(agent, stream=True) as span:
+        yield from stream_content(agent, message)
+        span.add_tokens(_run_metrics(agent))
+
+
+def cached_stream(agent, message, cache=None):
+    """Streaming counterpart of cached_run, yields chunks of the response text."""
+    if cache is None:
+        return _traced_stream(agent, message)
+    return cache.stream(agent, message)
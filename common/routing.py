@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+
+from common.rate_limit import RateLimitedGroq
+from common.response_cache import cached_run
+
+logger = logging.getLogger(__name__)
+
+SMALL_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+SMALL_TOOL_MODEL = "llama3-groq-8b-8192-tool-use-preview"
+LARGE_TOOL_MODEL = "llama3-groq-70B-8192-tool-use-preview"
+
+# Model of every agent, keyed by "<app>.<stage>". A fallback model is tried when the
+# routed model's answer fails validation (see run_routed).
+DEFAULT_ROUTES = {
+    "journalist.news_collector": {"model": SMALL_MODEL, "fallback": LARGE_MODEL},
+    "journalist.summary_writer": {"model": LARGE_MODEL},
+    "journalist.trend_analyzer": {"model": LARGE_MODEL},
+    "financial.web_search_agent": {"model": SMALL_TOOL_MODEL},
+    "financial.financial_agent": {"model": SMALL_TOOL_MODEL},
+    "financial.coordinator": {"model": LARGE_TOOL_MODEL},
+    "financial.report": {"model": LARGE_TOOL_MODEL},
+}
+
+
+def load_routes(path=None):
+    """DEFAULT_ROUTES updated from the JSON file at path or $MODEL_ROUTES.
+
+    Values are either a model id or an object with "model" and optional "fallback"
+    keys, e.g. {"journalist.summary_writer": "llama-3.1-8b-instant"}.
+    """
+    routes = {stage: dict(route) for stage, route in DEFAULT_ROUTES.items()}
+    path = path or os.getenv("MODEL_ROUTES")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for stage, route in json.load(f).items():
+                routes[stage] = {"model": route} if isinstance(route, str) else dict(route)
+    return routes
+
+
+class ModelRouter:
+    """Builds the model each stage is routed to.
+
+    Every call returns a new model instance, agents attach their tools to the model
+    they are given, so instances can't be shared between agents.
+    """
+
+    def __init__(self, routes=None, model_class=RateLimitedGroq, **model_kwargs):
+        self.routes = routes or load_routes()
+        self.model_class = model_class
+        self.model_kwargs = model_kwargs
+
+    def model_id(self, stage):
+        return self.routes[stage]["model"]
+
+    def model(self, stage):
+        return self.model_class(id=self.model_id(stage), **self.model_kwargs)
+
+    def fallback(self, stage):
+        model_id = self.routes[stage].get("fallback")
+        if not model_id or model_id == self.model_id(stage):
+            return None
+        return self.model_class(id=model_id, **self.model_kwargs)
+
+
+def run_routed(models, stage, build_agent, message, cache=None, validate=None):
+    """Run the agent for stage on its routed model, escalating to the fallback model when needed.
+
+    The fallback is tried when the first run raises (small models often produce
+    malformed tool calls) or when validate returns False for its content.
+    """
+    fallback = models.fallback(stage)
+    try:
+        response = cached_run(build_agent(models.model(stage)), message, cache)
+    except Exception as e:
+        if fallback is None:
+            raise
+        logger.warning("%s failed on %s, retrying on %s: %s", stage, models.model_id(stage), fallback.id, e)
+    else:
+        if fallback is None or validate is None or validate(response.content):
+            return response
+        logger.info("%s answer from %s failed validation, retrying on %s", stage, models.model_id(stage), fallback.id)
+    return cached_run(build_agent(fallback), message, cache)
@@ -0,0 +1,153 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from phi.tools.duckduckgo import DuckDuckGo
+
+from common.tracing import mark_cache_hit
+
+NEWS_TTL = 15 * 60
+SEARCH_TTL = 6 * 3600
+# How long past its TTL an entry may still be served while it refreshes in the background
+NEWS_MAX_STALE = 5 * 60
+SEARCH_MAX_STALE = 24 * 3600
+MAX_ENTRIES = 2048
+
+# Quoted phrases, operators and site:/filetype: filters make word order meaningful
+ORDER_SENSITIVE = re.compile(r"[\"'():]|(^|\s)[-+~]\S|\b(OR|AND|NOT)\b")
+
+
+def normalize_query(query):
+    # Search is case-insensitive except for the boolean operators
+    words = [word if word in ("OR", "AND", "NOT") else word.lower() for word in query.split()]
+    if ORDER_SENSITIVE.search(query):
+        return " ".join(words)
+    return " ".join(sorted(words))
+
+
+class SearchCache:
+    """In-memory LRU of search results with stale-while-revalidate refreshes."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_stale=SEARCH_MAX_STALE):
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _refresh(self, key, fetch):
+        try:
+            self._store(key, fetch())
+        except Exception:
+            # Keep serving the stale copy, the next lookup will try again
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_fetch(self, key, ttl, fetch, max_stale=None):
+        max_stale = self.max_stale if max_stale is None else max_stale
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = time.time() - fetched_at
+                if age <= ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    mark_cache_hit(True)
+                    return value
+                if age <= ttl + max_stale:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    mark_cache_hit(True)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                    return value
+            self.misses += 1
+
+        mark_cache_hit(False)
+        value = fetch()
+        self._store(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache()
+        return _default_cache
+
+
+class CachedDuckDuckGo(DuckDuckGo):
+    """DuckDuckGo tool that answers repeated queries from a shared SearchCache.
+
+    News and web results keep separate TTLs. Results that expired less than
+    news_max_stale or search_max_stale seconds ago are still returned right away
+    while a background thread fetches fresh ones.
+    """
+
+    def __init__(self, cache=None, news_ttl=NEWS_TTL, search_ttl=SEARCH_TTL, news_max_stale=NEWS_MAX_STALE,
+                 search_max_stale=SEARCH_MAX_STALE, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache or get_search_cache()
+        self.news_ttl = news_ttl
+        self.search_ttl = search_ttl
+        self.news_max_stale = news_max_stale
+        self.search_max_stale = search_max_stale
+
+    def _key(self, kind, query, max_results):
+        return kind, normalize_query(query), self.fixed_max_results or max_results, getattr(self, "modifier", None)
+
+    def duckduckgo_search(self, query: str, max_results: int = 5) -> str:
+        """Use this function to search DuckDuckGo for a query.
+
+        Args:
+            query(str): The query to search for.
+            max_results (optional, default=5): The maximum number of results to return.
+
+        Returns:
+            The result from DuckDuckGo.
+        """
+        fetch = super().duckduckgo_search
+        return self.cache.get_or_fetch(
+            self._key("search", query, max_results), self.search_ttl, lambda: fetch(query, max_results),
+            self.search_max_stale,
+        )
+
+    def duckduckgo_news(self, query: str, max_results: int = 5) -> str:
+        """Use this function to get the latest news from DuckDuckGo.
+
+        Args:
+            query(str): The query to search for.
+            max_results (optional, default=5): The maximum number of results to return.
+
+        Returns:
+            The latest news from DuckDuckGo.
+        """
+        fetch = super().duckduckgo_news
+        return self.cache.get_or_fetch(
+            self._key("news", query, max_results), self.news_ttl, lambda: fetch(query, max_results),
+            self.news_max_stale,
+        )
@@ -0,0 +1,276 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+TRACE_DIR = Path(os.getenv("TRACE_DIR", Path.home() / ".cache" / "ai-agents" / "traces"))
+TRACING_ENABLED = os.getenv("TRACING", "1").lower() not in ("0", "false", "no")
+# The span log is rotated to <service>.spans.jsonl.1 (then .2, ...) once it grows past this size
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", 50 * 1024 * 1024))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", 3))
+# Seconds between rewrites of the Prometheus snapshot file
+METRICS_FLUSH_INTERVAL = 5.0
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_current_span = ContextVar("current_span", default=None)
+
+
+def mark_cache_hit(hit):
+    """Record a cache lookup on the innermost open span, if there is one."""
+    span = _current_span.get()
+    if span is not None:
+        span.cache_hit = hit
+
+
+def token_counts(metrics):
+    """(prompt, completion) token totals from a phidata RunResponse.metrics dict."""
+    def total(*keys):
+        for key in keys:
+            value = (metrics or {}).get(key)
+            if value is not None:
+                return sum(value) if isinstance(value, (list, tuple)) else value
+        return 0
+
+    return total("input_tokens", "prompt_tokens"), total("output_tokens", "completion_tokens")
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+class Span:
+    def __init__(self, name, kind, parent=None, queued_at=None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self._started = time.monotonic()
+        # queued_at is a time.monotonic() timestamp taken when the work was submitted
+        self.queue_time = max(0.0, self._started - queued_at) if queued_at is not None else 0.0
+        self.wall_time = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hit = None
+        self.error = None
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_tokens(self, metrics):
+        prompt_tokens, completion_tokens = token_counts(metrics)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def finish(self):
+        self.wall_time = time.monotonic() - self._started
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "wall_ms": round(self.wall_time * 1000, 3),
+            "queue_ms": round(self.queue_time * 1000, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_hit": self.cache_hit,
+            "error": self.error,
+            **self.attributes,
+        }
+
+
+class Tracer:
+    """Records spans for agent runs, tool calls and pipeline tasks.
+
+    Finished spans are appended to <service>.spans.jsonl, rotated once it reaches
+    max_bytes, and aggregated into a Prometheus text snapshot, <service>.prom,
+    that a textfile collector or a local scraper can read.
+    """
+
+    def __init__(self, service, directory=TRACE_DIR, enabled=TRACING_ENABLED, flush_interval=METRICS_FLUSH_INTERVAL,
+                 max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS):
+        self.service = service
+        self.enabled = enabled
+        self.directory = Path(directory)
+        self.spans_path = self.directory / f"{service}.spans.jsonl"
+        self.metrics_path = self.directory / f"{service}.prom"
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        if enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            atexit.register(self.write_metrics)
+
+    @contextmanager
+    def span(self, name, kind="agent", queued_at=None, **attributes):
+        span = Span(name, kind, parent=_current_span.get(), queued_at=queued_at, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            # A consumer closing a streaming generator early is not an error
+            if not isinstance(e, GeneratorExit):
+                span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # Streaming generators may be finished from another context
+            with suppress(ValueError):
+                _current_span.reset(token)
+            span.finish()
+            if self.enabled:
+                self._record(span)
+
+    def _record(self, span):
+        line = json.dumps({"service": self.service, **span.to_dict()}, default=str)
+        with self._lock:
+            with open(self.spans_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                size = f.tell()
+            if self.max_bytes and size >= self.max_bytes:
+                self._rotate()
+
+            stats = self._stats.setdefault((span.kind, span.name), {
+                "count": 0, "errors": 0, "cache_hits": 0, "seconds": 0.0, "queue_seconds": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "buckets": [0] * len(LATENCY_BUCKETS),
+            })
+            stats["count"] += 1
+            stats["errors"] += span.error is not None
+            stats["cache_hits"] += bool(span.cache_hit)
+            stats["seconds"] += span.wall_time
+            stats["queue_seconds"] += span.queue_time
+            stats["prompt_tokens"] += span.prompt_tokens
+            stats["completion_tokens"] += span.completion_tokens
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if span.wall_time <= bound:
+                    stats["buckets"][index] += 1
+
+            flush = time.monotonic() - self._last_flush >= self.flush_interval
+        if flush:
+            self.write_metrics()
+
+    def _rotate(self):
+        # Another process writing the same log may have rotated it already
+        with suppress(OSError):
+            for index in range(self.backups - 1, 0, -1):
+                backup = self.spans_path.with_name(f"{self.spans_path.name}.{index}")
+                if backup.exists():
+                    os.replace(backup, self.spans_path.with_name(f"{self.spans_path.name}.{index + 1}"))
+            if self.backups:
+                os.replace(self.spans_path, self.spans_path.with_name(f"{self.spans_path.name}.1"))
+            else:
+                os.unlink(self.spans_path)
+
+    def stats(self):
+        """Copy of the aggregated span stats, keyed by (kind, name)."""
+        with self._lock:
+            return {key: {**value, "buckets": list(value["buckets"])} for key, value in self._stats.items()}
+
+    def prometheus_text(self):
+        def labels(kind, name, **extra):
+            pairs = {"service": self.service, "kind": kind, "name": name, **extra}
+            return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in pairs.items()) + "}"
+
+        stats = self.stats()
+
+        lines = [
+            "# HELP agent_span_duration_seconds Wall time of agent runs, tool calls and pipeline tasks.",
+            "# TYPE agent_span_duration_seconds histogram",
+        ]
+        for (kind, name), value in sorted(stats.items()):
+            for bound, count in zip(LATENCY_BUCKETS, value["buckets"]):
+                lines.append(f"agent_span_duration_seconds_bucket{labels(kind, name, le=bound)} {count}")
+            lines.append(f"agent_span_duration_seconds_bucket{labels(kind, name, le='+Inf')} {value['count']}")
+            lines.append(f"agent_span_duration_seconds_sum{labels(kind, name)} {value['seconds']:.6f}")
+            lines.append(f"agent_span_duration_seconds_count{labels(kind, name)} {value['count']}")
+
+        counters = (
+            ("agent_span_queue_seconds_total", "Time spent waiting for a worker before the span started.", "queue_seconds"),
+            ("agent_span_errors_total", "Spans that ended with an exception.", "errors"),
+            ("agent_span_cache_hits_total", "Spans answered from a cache.", "cache_hits"),
+        )
+        for metric, description, key in counters:
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+            for (kind, name), value in sorted(stats.items()):
+                lines.append(f"{metric}{labels(kind, name)} {value[key]}")
+
+        lines += ["# HELP agent_tokens_total Prompt and completion tokens reported by the model.",
+                  "# TYPE agent_tokens_total counter"]
+        for (kind, name), value in sorted(stats.items()):
+            lines.append(f"agent_tokens_total{labels(kind, name, type='prompt')} {value['prompt_tokens']}")
+            lines.append(f"agent_tokens_total{labels(kind, name, type='completion')} {value['completion_tokens']}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self):
+        if not self.enabled:
+            return
+        self._last_flush = time.monotonic()
+        text = self.prometheus_text()
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self.metrics_path)
+        except OSError:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+
+
+_default_tracer = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_tracer(service=None):
+    """Process-wide tracer. The first caller names the service, later calls may omit it."""
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            _default_tracer = Tracer(service or os.getenv("TRACE_SERVICE", "agents"))
+        return _default_tracer
+
+
+def _traced_tool(name, entrypoint):
+    @wraps(entrypoint)
+    def wrapper(*args, **kwargs):
+        with get_tracer().span(name, kind="tool"):
+            return entrypoint(*args, **kwargs)
+
+    wrapper._traced = True
+    return wrapper
+
+
+def instrument_tools(agent):
+    """Wrap the toolkit functions of an agent and its team so every tool call records a span."""
+    for tool in agent.tools or []:
+        functions = getattr(tool, "functions", None)
+        if not isinstance(functions, dict):
+            continue
+        for name, function in functions.items():
+            if function.entrypoint is not None and not getattr(function.entrypoint, "_traced", False):
+                function.entrypoint = _traced_tool(name, function.entrypoint)
+    for member in agent.team or []:
+        instrument_tools(member)
+
+
+@contextmanager
+def trace_agent(agent, **attributes):
+    """Span around one run of agent, with its tool calls instrumented."""
+    instrument_tools(agent)
+    model = agent.model.id if agent.model else None
+    with get_tracer().span(agent.name or "Agent", kind="agent", model=model, **attributes) as span:
+        yield span
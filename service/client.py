@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+DEFAULT_URL = os.getenv("AGENT_SERVICE_URL", "http://127.0.0.1:8765")
+# Seconds each poll for a Journalist analysis waits on the server
+POLL_WAIT = 5
+
+
+def request(base_url, method, path, body=None, timeout=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        base_url.rstrip("/") + path, data=data, method=method, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            payload = response.read().decode()
+            if response.headers.get_content_type() == "application/json":
+                return json.loads(payload)
+            return payload
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error")
+        except ValueError:
+            message = None
+        sys.exit(f"Error {e.code}: {message or e.reason}")
+    except urllib.error.URLError as e:
+        sys.exit(f"Service not reachable at {base_url}: {e.reason}")
+
+
+def run_journalist(args):
+    job = request(args.url, "POST", "/journalist/jobs", {"topic": args.topic, "token_budget": args.token_budget})
+    shown = 0
+    while True:
+        summaries = job["summaries"]
+        for article, _ in summaries[shown:]:
+            print(f"Summarized {article['title']}", file=sys.stderr)
+        shown = len(summaries)
+        if job["status"] in ("done", "failed"):
+            break
+        job = request(args.url, "GET", f"/journalist/jobs/{job['id']}?wait={POLL_WAIT}")
+    if job["status"] == "failed":
+        sys.exit(f"Analysis failed: {job['error']}")
+    print(job["analysis"])
+
+
+def run_health(args):
+    profile = {
+        "age": args.age, "weight": args.weight, "height": args.height, "sex": args.sex,
+        "activity_level": args.activity_level, "dietary_preferences": args.dietary_preferences,
+        "fitness_goals": args.fitness_goals, "shared": args.shared,
+    }
+    plans = request(args.url, "POST", "/health/plans", profile)
+    print(f"## Dietary plan\n\n{plans['dietary']['meal_plan']}\n\n## Fitness plan\n\n{plans['fitness']['routine']}")
+    print(f"\nAsk about these plans with: client.py ask {plans['session']} \"<question>\"", file=sys.stderr)
+
+
+def run_ask(args):
+    print(request(args.url, "POST", "/health/ask", {"session": args.session, "question": args.question})["answer"])
+
+
+def run_financial(args):
+    print(request(args.url, "POST", "/financial/report", {"query": args.query, "symbol": args.symbol})["report"])
+
+
+def run_status(args):
+    print(json.dumps(request(args.url, "GET", "/status"), indent=2))
+
+
+def run_metrics(args):
+    print(request(args.url, "GET", "/metrics"), end="")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Command-line client for the agent service (service/server.py).")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"Service URL (default: $AGENT_SERVICE_URL or {DEFAULT_URL})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    journalist = commands.add_parser("journalist", help="Analyze startup trends for a topic")
+    journalist.add_argument("topic")
+    journalist.add_argument("--token-budget", type=int, help="Compress articles to this many tokens before summarizing")
+    journalist.set_defaults(run=run_journalist)
+
+    health = commands.add_parser("health", help="Generate dietary and fitness plans")
+    health.add_argument("--age", type=int, required=True)
+    health.add_argument("--weight", type=float, required=True, help="Weight in kg")
+    health.add_argument("--height", type=float, required=True, help="Height in cm")
+    health.add_argument("--sex", default="Other")
+    health.add_argument("--activity-level", default="Moderately Active")
+    health.add_argument("--dietary-preferences", default="Vegetarian")
+    health.add_argument("--fitness-goals", default="Stay Fit")
+    health.add_argument("--shared", action="store_true", help="Serve plans shared with similar profiles")
+    health.set_defaults(run=run_health)
+
+    ask = commands.add_parser("ask", help="Ask a question about the plans of a health session")
+    ask.add_argument("session")
+    ask.add_argument("question")
+    ask.set_defaults(run=run_ask)
+
+    financial = commands.add_parser("financial", help="Write a stock report")
+    financial.add_argument("query", nargs="?", help="Question for the Financial team (default: the NVDA report)")
+    financial.add_argument("--symbol", help="Prefetch all data for this ticker and write the report in one call")
+    financial.set_defaults(run=run_financial)
+
+    commands.add_parser("status", help="Show uptime and loaded apps").set_defaults(run=run_status)
+    commands.add_parser("metrics", help="Print the Prometheus metrics").set_defaults(run=run_metrics)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
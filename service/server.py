@@ -0,0 +1,377 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger("service")
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_DIRS = ("Journalist_Agent", "Health_Agent", "Financial-agent")
+APPS = ("journalist", "health", "financial")
+DEFAULT_PORT = 8765
+FINANCIAL_QUERY = "Summarize analyst recommendations and share the latest news for NVDA stock and detailed report also"
+# Health Q&A sessions kept in memory, the least recently used one is dropped first
+MAX_QA_SESSIONS = 256
+# Connections kept open to each provider host across requests
+MAX_CONNECTIONS = 64
+PROVIDER_TIMEOUT = 120.0
+# Longest a request may wait for a Journalist analysis before getting its progress instead
+MAX_JOB_WAIT = 600.0
+# Tickers like NVDA, BRK-B, ^GSPC or EURUSD=X, the symbol names a directory of the market data store
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9^][A-Z0-9.=-]{0,14}")
+
+
+def add_app_paths():
+    for path in (ROOT_DIR, *(ROOT_DIR / name for name in APP_DIRS)):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_number(value, name, kind=float, minimum=0):
+    """value as a kind no smaller than minimum, RequestError 400 otherwise."""
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise RequestError(400, f"{name} must be a number, got {value!r}")
+    # Also catches NaN
+    if not number >= minimum:
+        raise RequestError(400, f"{name} must be at least {minimum}, got {value!r}")
+    return number
+
+
+class AgentService:
+    """The three apps in one process, sharing models, provider connections and caches.
+
+    App modules are imported on first use (or all at once by warm()), so a
+    request only pays for what it needs and every later request pays nothing.
+    Agents are still built per request since they keep per-run state, but the
+    Groq models they are given share one pooled HTTP client and the Health app
+    reuses a single Gemini model.
+    """
+
+    def __init__(self, use_cache=True):
+        self.use_cache = use_cache
+        self.started = time.time()
+        self._apps = {}
+        self._apps_lock = threading.Lock()
+        self._http_client = None
+        self._models = None
+        self._gemini = None
+        self._clients_lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+
+    def _load(self, app):
+        with self._apps_lock:
+            if app not in self._apps:
+                started = time.perf_counter()
+                if app == "journalist":
+                    import jobs
+                    import pipeline
+
+                    self._apps[app] = {"jobs": jobs, "pipeline": pipeline}
+                elif app == "health":
+                    import plan_cache
+                    import planner
+                    import qa
+
+                    self._apps[app] = {"planner": planner, "qa": qa, "plan_cache": plan_cache}
+                else:
+                    import financial_agent
+                    import prefetch
+
+                    self._apps[app] = {"financial_agent": financial_agent, "prefetch": prefetch}
+                logger.info("Loaded %s in %.2fs", app, time.perf_counter() - started)
+            return self._apps[app]
+
+    @property
+    def models(self):
+        with self._clients_lock:
+            if self._models is None:
+                import httpx
+                from common.routing import ModelRouter
+
+                self._http_client = httpx.Client(
+                    limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                    timeout=PROVIDER_TIMEOUT,
+                )
+                # Reads GROQ_API_KEY from the environment
+                self._models = ModelRouter(http_client=self._http_client)
+            return self._models
+
+    @property
+    def gemini(self):
+        planner = self._load("health")["planner"]
+        with self._clients_lock:
+            if self._gemini is None:
+                from phi.model.google import Gemini
+
+                # Reads GOOGLE_API_KEY from the environment, the model keeps its client between requests
+                self._gemini = Gemini(id=planner.MODEL_ID)
+            return self._gemini
+
+    @property
+    def cache(self):
+        from common.response_cache import get_response_cache
+
+        return get_response_cache() if self.use_cache else None
+
+    def warm(self, apps=APPS):
+        for app in apps:
+            self._load(app)
+        # Build the shared clients now instead of on the first request
+        self.models
+        if "health" in apps:
+            self.gemini
+
+    def status(self):
+        with self._apps_lock:
+            loaded = sorted(self._apps)
+        with self._sessions_lock:
+            sessions = len(self._sessions)
+        return {"uptime": time.time() - self.started, "loaded": loaded, "qa_sessions": sessions}
+
+    def journalist_submit(self, body):
+        modules = self._load("journalist")
+        topic = (body.get("topic") or "").strip()
+        if not topic:
+            raise RequestError(400, "topic is required")
+        token_budget = body.get("token_budget")
+        if token_budget is not None:
+            token_budget = parse_number(token_budget, "token_budget", int, minimum=1)
+        wait = parse_number(body.get("wait") or 0, "wait")
+        job_id = modules["jobs"].get_job_manager().submit(
+            topic, self.models, cache=self.cache, token_budget=token_budget
+        )
+        return self.journalist_job(job_id, wait)
+
+    def journalist_job(self, job_id, wait=0):
+        wait = parse_number(wait or 0, "wait")
+        manager = self._load("journalist")["jobs"].get_job_manager()
+        deadline = time.monotonic() + min(wait, MAX_JOB_WAIT)
+        while True:
+            job = manager.get(job_id)
+            if job is None:
+                raise RequestError(404, f"no job {job_id}")
+            if job.done or time.monotonic() >= deadline:
+                return job.snapshot()
+            time.sleep(0.2)
+
+    def _shared_plans(self, body, modules):
+        plan_cache = modules["plan_cache"]
+        bucketed = plan_cache.bucket_profile(body)
+        key = plan_cache.profile_key(bucketed, self.gemini.id)
+        store = plan_cache.get_plan_store()
+        plans = store.get(key)
+        if plans is None:
+            plans = plan_cache.generate_bucket_plans(self.gemini, key, self.cache)
+            store.put(key, plans)
+        return plans
+
+    def health_plans(self, body):
+        modules = self._load("health")
+        planner = modules["planner"]
+        missing = [field for field in modules["plan_cache"].PROFILE_FIELDS if body.get(field) in (None, "")]
+        if missing:
+            raise RequestError(400, f"missing profile fields: {', '.join(missing)}")
+        body = {
+            **body,
+            "age": parse_number(body["age"], "age", int, minimum=1),
+            "weight": parse_number(body["weight"], "weight", minimum=1),
+            "height": parse_number(body["height"], "height", minimum=1),
+        }
+
+        if body.get("shared"):
+            plans = self._shared_plans(body, modules)
+        else:
+            user_profile = planner.build_user_profile(
+                *(body[field] for field in modules["plan_cache"].PROFILE_FIELDS)
+            )
+            plans = {}
+            for kind, event, value in planner.generate_plans(self.gemini, user_profile, self.cache):
+                if event == "error":
+                    raise RequestError(502, f"{kind} plan failed: {value}")
+                if event == "done":
+                    plans[kind] = value
+
+        session_id = uuid.uuid4().hex
+        with self._sessions_lock:
+            self._sessions[session_id] = modules["qa"].PlanQA(self.gemini, plans["dietary"], plans["fitness"])
+            while len(self._sessions) > MAX_QA_SESSIONS:
+                self._sessions.popitem(last=False)
+        return {"session": session_id, **plans}
+
+    def health_ask(self, body):
+        question = (body.get("question") or "").strip()
+        if not question:
+            raise RequestError(400, "question is required")
+        with self._sessions_lock:
+            plan_qa = self._sessions.get(body.get("session"))
+            if plan_qa is None:
+                raise RequestError(404, "unknown or expired session, generate the plans again")
+            self._sessions.move_to_end(body["session"])
+        return {"answer": "".join(plan_qa.ask(question, self.cache))}
+
+    def financial_report(self, body):
+        from common.response_cache import cached_run
+
+        symbol = body.get("symbol")
+        if symbol and (not isinstance(symbol, str) or not SYMBOL_PATTERN.fullmatch(symbol.upper())):
+            raise RequestError(400, f"symbol must be a ticker like NVDA, got {symbol!r}")
+        modules = self._load("financial")
+        financial_agent = modules["financial_agent"]
+        if not symbol:
+            # Team members run in parallel, the coordinator writes the report from their answers
+            return {"report": financial_agent.run_team(body.get("query") or FINANCIAL_QUERY, self.models, self.cache)}
+        # All market data fetched in parallel, then a single report call
+        snapshot = modules["prefetch"].prefetch_snapshot(symbol.upper())
+        agent = financial_agent.build_report_agent(self.models)
+        return {"report": cached_run(agent, financial_agent.build_report_prompt(snapshot), self.cache).content}
+
+    def metrics(self):
+        from common.tracing import get_tracer
+
+        return get_tracer().prometheus_text()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON API over AgentService, see README.md for the routes."""
+
+    server_version = "AgentService/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise RequestError(400, "body must be JSON")
+        if not isinstance(body, dict):
+            raise RequestError(400, "body must be a JSON object")
+        return body
+
+    def _send(self, body, status=200, content_type="application/json"):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, route):
+        try:
+            result = route()
+        except RequestError as e:
+            self._send(json.dumps({"error": str(e)}), e.status)
+        except Exception as e:
+            logger.exception("%s %s failed", self.command, self.path)
+            self._send(json.dumps({"error": str(e) or type(e).__name__}), 500)
+        else:
+            if isinstance(result, str):
+                self._send(result, content_type="text/plain; version=0.0.4")
+            else:
+                self._send(json.dumps(result, default=str))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/status":
+            self._handle(self.service.status)
+        elif url.path == "/metrics":
+            self._handle(self.service.metrics)
+        elif url.path.startswith("/journalist/jobs/"):
+            job_id = url.path.rsplit("/", 1)[1]
+            self._handle(lambda: self.service.journalist_job(job_id, query.get("wait", [0])[0]))
+        else:
+            self._handle(self._not_found)
+
+    def do_POST(self):
+        routes = {
+            "/journalist/jobs": self.service.journalist_submit,
+            "/health/plans": self.service.health_plans,
+            "/health/ask": self.service.health_ask,
+            "/financial/report": self.service.financial_report,
+        }
+        route = routes.get(urlsplit(self.path).path)
+        if route is None:
+            self._handle(self._not_found)
+        else:
+            self._handle(lambda: route(self._read_json()))
+
+    def _not_found(self):
+        raise RequestError(404, f"no route {self.command} {urlsplit(self.path).path}")
+
+
+class ServiceServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, ServiceHandler)
+        self.service = service
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the Journalist, Health and Financial agents from one long-running process."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--warm", default=",".join(APPS),
+                        help="Comma-separated apps to load at startup, the rest load on first use "
+                             f"(default: {','.join(APPS)}, '' for none)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the local response cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(message)s")
+    add_app_paths()
+    from common.tracing import get_tracer
+
+    # Named before any app module asks for the tracer
+    get_tracer("service")
+    service = AgentService(use_cache=not args.no_cache)
+    warm = [app for app in args.warm.split(",") if app]
+    unknown = set(warm) - set(APPS)
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(sorted(unknown))}")
+    started = time.perf_counter()
+    service.warm(warm)
+    server = ServiceServer((args.host, args.port), service)
+    logger.info("Serving on %s (warmed %s in %.2fs)", server.url, ", ".join(warm) or "nothing",
+                time.perf_counter() - started)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# The apps are plain script directories, make their modules and common/ importable
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_DIRS = ("Journalist_Agent", "Health_Agent", "Financial-agent", "benchmarks")
+for path in (ROOT_DIR, *(ROOT_DIR / name for name in APP_DIRS)):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
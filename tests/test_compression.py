@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from compression import compress_articles, is_boilerplate, split_sentences
+
+
+def test_split_sentences_keeps_abbreviations_together():
+    text = "Dr. Smith met J. Doe on Monday. Mr. Brown left early. Prices rose, e.g. for chips."
+    assert split_sentences(text) == [
+        "Dr. Smith met J. Doe on Monday.",
+        "Mr. Brown left early.",
+        "Prices rose, e.g. for chips.",
+    ]
+
+
+def test_split_sentences_keeps_acronyms_and_company_names_together():
+    text = "Revenue rose 5% in Q3. U.S. Stocks fell. Apple Inc. Shares rose after J.P. Morgan upgraded them."
+    assert split_sentences(text) == [
+        "Revenue rose 5% in Q3.",
+        "U.S. Stocks fell.",
+        "Apple Inc. Shares rose after J.P. Morgan upgraded them.",
+    ]
+
+
+def test_split_sentences_keeps_closing_quotes():
+    assert split_sentences('He said "We will ship." Shares rose.') == ['He said "We will ship."', "Shares rose."]
+
+
+def test_split_sentences_does_not_join_paragraphs():
+    assert split_sentences("Written by Dr.\nSmith filed the report.") == ["Written by Dr.", "Smith filed the report."]
+
+
+@pytest.mark.parametrize("sentence", ["Shares fell 12%.", "Revenue doubled.", 'He said "No."'])
+def test_short_sentences_are_not_boilerplate(sentence):
+    assert not is_boilerplate(sentence)
+
+
+@pytest.mark.parametrize("sentence", [
+    "Advertisement",
+    "By Jane Doe",
+    "Read more",
+    "Subscribe to our newsletter for the latest updates.",
+    "Copyright 2026 Example News. All rights reserved.",
+])
+def test_boilerplate(sentence):
+    assert is_boilerplate(sentence)
+
+
+def test_compress_articles_keeps_short_facts():
+    article = {"url": "https://example.com/a", "title": "A", "text": "Advertisement\nShares fell 12%. Revenue doubled."}
+    compressed, stats = compress_articles([article])
+    assert compressed[0]["text"] == "Shares fell 12%. Revenue doubled."
+    assert stats["boilerplate"] == 1
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("groq")
+pytest.importorskip("phi.model.groq")
+
+from phi.model.message import Message
+
+import common.rate_limit as rate_limit
+from common.rate_limit import RateLimitedGroq
+from stub_server import StubConfig, StubServer
+
+
+@pytest.fixture
+def failing_server():
+    server = StubServer(config=StubConfig(failure_rate=1.0, failure_status=503)).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("retries", [0, 1, 2])
+def test_one_request_per_attempt(failing_server, monkeypatch, retries):
+    monkeypatch.setenv("GROQ_BASE_URL", failing_server.url)
+    monkeypatch.setattr(rate_limit, "backoff_delay", lambda attempt, error: 0)
+    model = RateLimitedGroq(id="llama-3.3-70b-versatile", api_key="stub", rate_limit_retries=retries)
+    with pytest.raises(Exception) as error:
+        model.invoke([Message(role="user", content="Hello")])
+    assert rate_limit.status_code(error.value) == 503
+    # The SDK must not retry on its own, every attempt is a single request
+    assert failing_server.snapshot()["groq_failures"] == retries + 1